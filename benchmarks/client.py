@@ -0,0 +1,117 @@
+"""
+End-to-end throughput and latency of lifx.lan.client.asynchronous.Client
+against a loopback responder answering every request with a StatePower
+
+    python -m benchmarks.client [--save NAME]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import lifx
+
+from benchmarks.common import main
+
+
+MESSAGES = 2000
+ROUNDTRIPS = 500
+TIMEOUT = 10
+
+
+class Responder(asyncio.DatagramProtocol):
+    def __init__(self):
+        body = lifx.lan.light.StatePower()
+        body.level = body.ON
+        self._reply = bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body))
+        self._transport = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def datagram_received(self, data, addr):
+        self._transport.sendto(self._reply, addr)
+
+
+class Counter(object):
+    def __init__(self, loop):
+        self._loop = loop
+        self.count = 0
+        self.expected = 0
+        self.done = None
+
+    def expect(self, count):
+        self.count = 0
+        self.expected = count
+        self.done = self._loop.create_future()
+        return self.done
+
+    async def __call__(self, msg):
+        self.count += 1
+        if self.count >= self.expected and not self.done.done():
+            self.done.set_result(None)
+
+
+async def throughput(protocol, counter, msgs):
+    done = counter.expect(len(msgs))
+    start = time.perf_counter()
+    await protocol.write(msgs, interval=0)
+    sent = time.perf_counter() - start
+    try:
+        await asyncio.wait_for(done, TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - start
+    return len(msgs) / sent, counter.count / elapsed, 1 - counter.count / len(msgs)
+
+
+async def latency(protocol, counter, msg, count):
+    samples = []
+    for _ in range(count):
+        done = counter.expect(1)
+        start = time.perf_counter()
+        await protocol.write([msg], interval=0)
+        await asyncio.wait_for(done, TIMEOUT)
+        samples.append((time.perf_counter() - start) * 1e3)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def benchmarks():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    transport, _ = loop.run_until_complete(
+        loop.create_datagram_endpoint(Responder, local_addr=("127.0.0.1", 0))
+    )
+    remote = transport.get_extra_info("sockname")
+
+    counter = Counter(loop)
+    client, protocol = loop.run_until_complete(
+        loop.create_datagram_endpoint(
+            lambda: lifx.lan.client.asynchronous.Client([counter]),
+            local_addr=("127.0.0.1", 0),
+        )
+    )
+
+    body = lifx.lan.light.GetPower()
+    msg = lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body, *remote)
+
+    send_rate, receive_rate, loss = loop.run_until_complete(
+        throughput(protocol, counter, [msg] * MESSAGES)
+    )
+    p50, p95 = loop.run_until_complete(latency(protocol, counter, msg, ROUNDTRIPS))
+
+    client.close()
+    transport.close()
+    loop.close()
+    return {
+        "send_msgs_per_s": send_rate,
+        "roundtrip_msgs_per_s": receive_rate,
+        "roundtrip_loss_ratio": loss,
+        "latency_p50_ms": p50,
+        "latency_p95_ms": p95,
+    }
+
+
+if __name__ == "__main__":
+    sys.exit(main("client", benchmarks))
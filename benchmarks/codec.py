@@ -0,0 +1,72 @@
+"""
+Micro-benchmarks for the encode/decode entry points
+
+    python -m benchmarks.codec [--save NAME]
+"""
+import sys
+
+import lifx
+
+from benchmarks.common import main, measure
+
+
+STATE = bytes.fromhex(
+    "58000054B9715D07D073D5121AF100004C4946585632004D1852421EB5FC8214"
+    "6B000000717ECC4C0957AC0D0000FFFF4C4946582042756C6220313231616631"
+    "000000000000000000000000000000000000000000000000"
+)
+SET_COLOR = "310000340000000000000000000000000000000000000000000000000000000066000000005555FFFFFFFFAC0D00040000"
+SET_COLOR_VALUES = {
+    "hue": 120,
+    "saturation": 100,
+    "brightness": 80,
+    "kelvin": 3500,
+    "duration": 1024,
+}
+
+
+def benchmarks():
+    msg = lifx.lan.Msg.from_bytes(STATE, "127.0.0.1", 56700)
+    _, state = msg.decode()
+    body = lifx.lan.light.State_Factory.make("SetColor", SET_COLOR_VALUES)
+    header = lifx.lan.header.make(body.state)
+    pool = lifx.lan.msg.Pool()
+    lines = [STATE.hex(), SET_COLOR] * 500
+
+    def read_hex():
+        for _ in lifx.lan.msg.read_hex(lines):
+            pass
+
+    def decode_pooled():
+        pool.release(*lifx.lan.Msg.decode_bytes(STATE, pool=pool))
+
+    return measure(
+        [
+            ("msg_from_bytes", lambda: lifx.lan.Msg.from_bytes(STATE), 2000),
+            ("msg_from_string", lambda: lifx.lan.Msg.from_string(SET_COLOR), 2000),
+            ("msg_repr", lambda: repr(msg), 2000),
+            ("read_hex_1000_lines", read_hex, 10),
+            ("msg_decode_state", msg.decode, 2000),
+            ("msg_decode_bytes_state", lambda: lifx.lan.Msg.decode_bytes(STATE), 5000),
+            ("msg_decode_bytes_pooled_state", decode_pooled, 5000),
+            ("msg_encode_set_color", lambda: lifx.lan.Msg.encode(header, body), 2000),
+            ("msg_bytes", lambda: bytes(msg), 2000),
+            ("state_label", lambda: state.label, 5000),
+            ("state_to_snapshot", state.to_snapshot, 2000),
+            ("header_make", lambda: lifx.lan.header.make("set_color_light"), 5000),
+            (
+                "state_factory_make",
+                lambda: lifx.lan.light.State_Factory.make("SetColor", SET_COLOR_VALUES),
+                2000,
+            ),
+            (
+                "description_factory_make",
+                lambda: lifx.lan.light.Description_Factory.make(state),
+                500,
+            ),
+        ]
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main("codec", benchmarks))
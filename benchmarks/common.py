@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import platform
+import timeit
+
+from typing import Callable, Dict, Iterable, Tuple
+
+
+RESULTS = os.path.join(os.path.dirname(__file__), "results")
+
+Benchmark = Tuple[str, Callable[[], None], int]
+
+
+def measure(benchmarks: Iterable[Benchmark], repeat: int = 5) -> Dict[str, float]:
+    """
+    Time every benchmark and keep the best run
+
+    :param benchmarks: a list of (name, callable, number of calls per run)
+    :param repeat: how many runs each benchmark gets
+    :return: a dict name -> best time per call, in microseconds
+    """
+    results = {}
+    for name, func, number in benchmarks:
+        best = min(timeit.Timer(func).repeat(repeat=repeat, number=number))
+        results["{}_us".format(name)] = best / number * 1e6
+    return results
+
+
+def higher_is_better(name: str) -> bool:
+    """
+    Rates (msgs_per_s, ...) improve when they grow, timings when they shrink
+    """
+    return name.endswith("_per_s")
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def load(name: str) -> Dict:
+    path = name if name.endswith(".json") else os.path.join(RESULTS, name + ".json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(name: str, suite: str, results: Dict[str, float]):
+    """
+    Merge the results of a suite into results/<name>.json
+
+    :param name: a label for the run, usually the released version
+    :param suite: the benchmark suite name (codec, client, ...)
+    :param results: a dict name -> measure
+    """
+    path = os.path.join(RESULTS, "{}.json".format(name))
+    stored = {"environment": environment(), "suites": {}}
+    if os.path.exists(path):
+        stored = load(path)
+    stored["suites"][suite] = results
+    with open(path, "w") as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(suite: str, benchmarks: Callable[[], Dict[str, float]]) -> int:
+    parser = argparse.ArgumentParser(description="lifx-lib {} benchmarks".format(suite))
+    parser.add_argument(
+        "--save", metavar="NAME", help="store results in benchmarks/results/NAME.json"
+    )
+    args = parser.parse_args()
+
+    results = benchmarks()
+    print(suite)
+    for name, value in results.items():
+        print("  {:<40} {:>14.3f}".format(name, value))
+    if args.save:
+        save(args.save, suite, results)
+    return 0
@@ -0,0 +1,47 @@
+"""
+Compare two stored benchmark runs
+
+    python -m benchmarks.compare 0.9.1 current [--threshold 0.1]
+
+Exits with 1 when any measure regressed more than threshold.
+"""
+import argparse
+import sys
+
+from benchmarks.common import higher_is_better, load
+
+
+def compare(baseline, current, threshold):
+    regressions = 0
+    for suite, results in sorted(current["suites"].items()):
+        reference = baseline["suites"].get(suite, {})
+        print(suite)
+        for name, value in sorted(results.items()):
+            if name not in reference or not reference[name]:
+                print("  {:<40} {:>14.3f}".format(name, value))
+                continue
+            change = (value - reference[name]) / reference[name]
+            worse = -change if higher_is_better(name) else change
+            flag = ""
+            if worse > threshold:
+                flag = "REGRESSION"
+                regressions += 1
+            print(
+                "  {:<40} {:>14.3f} {:>14.3f} {:>+8.1%} {}".format(
+                    name, reference[name], value, change, flag
+                )
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline", help="a name in benchmarks/results or a json path")
+    parser.add_argument("current", help="a name in benchmarks/results or a json path")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    return 1 if compare(load(args.baseline), load(args.current), args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
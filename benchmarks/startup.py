@@ -0,0 +1,46 @@
+"""
+Import time of the package, measured in fresh interpreters
+
+    python -m benchmarks.startup [--save NAME]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import main
+
+
+RUNS = 30
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ("import_lifx", "import lifx"),
+    (
+        "encode_one_message",
+        "import lifx; body = lifx.lan.light.GetPower(); "
+        "bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body))",
+    ),
+    ("import_client", "import lifx; lifx.lan.client.asynchronous.Client"),
+]
+
+
+def spawn(code: str) -> float:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-S", "-c", code], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def benchmarks():
+    interpreter = statistics.median(spawn("pass") for _ in range(RUNS))
+    results = {}
+    for name, code in SCENARIOS:
+        elapsed = statistics.median(spawn(code) for _ in range(RUNS))
+        results["{}_ms".format(name)] = (elapsed - interpreter) * 1e3
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(main("startup", benchmarks))
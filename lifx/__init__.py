@@ -1,2 +1,18 @@
+import importlib
+
 from lifx.msg import Msg, Octect
-from lifx import lan
+
+_submodules = {"lan", "msg", "trace"}
+
+
+def __getattr__(name):
+    """
+    Import subpackages on first access, so that `import lifx` stays cheap
+    """
+    if name in _submodules:
+        return importlib.import_module("{}.{}".format(__name__, name))
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules)
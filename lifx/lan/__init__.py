@@ -1,5 +1,41 @@
-from lifx.lan.msg import Msg
-from lifx.lan.header import Header
-from lifx.lan import light
-from lifx.lan.discovery import Discovery
-from lifx.lan import client
+import importlib
+
+_attributes = {
+    "Msg": "lifx.lan.msg",
+    "Header": "lifx.lan.header",
+    "Discovery": "lifx.lan.discovery",
+}
+_submodules = {
+    "batch",
+    "client",
+    "controller",
+    "discovery",
+    "header",
+    "history",
+    "index",
+    "light",
+    "msg",
+    "pcap",
+    "scene",
+    "snapshot",
+    "table",
+}
+
+
+def __getattr__(name):
+    """
+    Import submodules on first access: encoding a message does not need
+    asyncio, which the clients and the discovery pull in
+    """
+    if name in _attributes:
+        value = getattr(importlib.import_module(_attributes[name]), name)
+    elif name in _submodules:
+        value = importlib.import_module("{}.{}".format(__name__, name))
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_attributes) | _submodules)
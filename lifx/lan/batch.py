@@ -0,0 +1,203 @@
+import numbers
+
+from struct import Struct
+from typing import Iterable, Iterator, List, Sequence, Union
+
+from lifx.lan import header as lan_header
+from lifx.lan import light
+from lifx.lan.msg import HEADER_SIZE, Msg
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+Targets = Union[Iterable[Union[str, bytes]], "numpy.ndarray"]
+Column = Union[int, Sequence[int], "numpy.ndarray"]
+
+TARGET = slice(8, 16)
+
+# (name, offset in the message, struct format) of every SetColor and SetPower column
+_SET_COLOR = [
+    ("hue", HEADER_SIZE + 1, "H"),
+    ("saturation", HEADER_SIZE + 3, "H"),
+    ("brightness", HEADER_SIZE + 5, "H"),
+    ("kelvin", HEADER_SIZE + 7, "H"),
+    ("duration", HEADER_SIZE + 9, "I"),
+]
+_SET_POWER = [
+    ("level", HEADER_SIZE, "H"),
+]
+
+
+class Batch(object):
+    """
+    Messages of the same type and size laid out back to back in one buffer
+    """
+
+    __slots__ = ("data", "offsets", "size")
+
+    def __init__(self, data: bytes, size: int):
+        self.data = data
+        self.size = size
+        self.offsets = range(0, len(data), size)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> bytes:
+        offset = self.offsets[index]
+        return self.data[offset : offset + self.size]
+
+    def __iter__(self) -> Iterator[bytes]:
+        data, size = self.data, self.size
+        for offset in self.offsets:
+            yield data[offset : offset + size]
+
+
+def set_color(
+    targets: Targets,
+    hue: Column,
+    saturation: Column,
+    brightness: Column,
+    kelvin: Column,
+    duration: Column = 0,
+    header: "lifx.lan.Header" = None,
+) -> Batch:
+    """
+    One SetColor per target, each byte for byte what lifx.lan.Msg.encode gives.
+    Colors are raw protocol values (0..65535, kelvin degrees), duration is
+    in milliseconds; every column is a sequence or a numpy array as long as targets,
+    or a single value for all.
+
+    >>> import lifx
+    >>> targets = ["d073d5121af10000", "d073d5121af20000"]
+    >>> batch = lifx.lan.batch.set_color(targets, [0, 21845], 65535, [65535, 32768], 3500, duration=1024)
+    >>> len(batch), batch.size, list(batch.offsets)
+    (2, 49, [0, 49])
+    >>> header = lifx.lan.header.make("set_color_light")
+    >>> header.field.target[:] = bytes.fromhex(targets[1])
+    >>> body = lifx.lan.light.SetColor()
+    >>> body.field.color.hue, body.field.color.saturation = 21845, 65535
+    >>> body.field.color.brightness, body.field.color.kelvin = 32768, 3500
+    >>> body.duration = 1024
+    >>> batch[1] == bytes(lifx.lan.Msg.encode(header, body))
+    True
+    >>> lifx.lan.batch.set_color(targets + ["d073d5121af30000"], [1, 2], 65535, 65535, 3500)
+    Traceback (most recent call last):
+    ...
+    ValueError: hue has 2 values for 3 targets
+
+    :param targets: device targets (MAC address as 16 hex digits or bytes), or a (n, 8) uint8 array
+    :param hue: raw hue
+    :param saturation: raw saturation
+    :param brightness: raw brightness
+    :param kelvin: kelvin
+    :param duration: transition time in milliseconds
+    :param header: a lifx.lan.Header template, lifx.lan.header.make("set_color_light") when None
+    :return: a lifx.lan.batch.Batch
+    """
+    columns = {
+        "hue": hue,
+        "saturation": saturation,
+        "brightness": brightness,
+        "kelvin": kelvin,
+        "duration": duration,
+    }
+    return _encode(light.SetColor(), header, targets, _SET_COLOR, columns)
+
+
+def set_power(
+    targets: Targets, level: Column, header: "lifx.lan.Header" = None
+) -> Batch:
+    """
+    One SetPower per target, each byte for byte what lifx.lan.Msg.encode gives
+
+    >>> import lifx
+    >>> batch = lifx.lan.batch.set_power(["d073d5121af10000", "d073d5121af20000"], [65535, 0])
+    >>> body = lifx.lan.light.SetPower()
+    >>> header = lifx.lan.header.make(body.state)
+    >>> header.field.target[:] = bytes.fromhex("d073d5121af20000")
+    >>> batch[1] == bytes(lifx.lan.Msg.encode(header, body))
+    True
+    >>> lifx.lan.batch.set_power(["d073d5121af1000000", "d073d5121af20000"], 65535)
+    Traceback (most recent call last):
+    ...
+    ValueError: target d073d5121af1000000 is longer than 8 bytes
+
+    :param targets: device targets (MAC address as 16 hex digits or bytes), or a (n, 8) uint8 array
+    :param level: power level, lifx.lan.light.SetPower.ON or OFF
+    :param header: a lifx.lan.Header template, lifx.lan.header.make("set_power_light") when None
+    :return: a lifx.lan.batch.Batch
+    """
+    return _encode(light.SetPower(), header, targets, _SET_POWER, {"level": level})
+
+
+def _encode(body, header, targets, layout, columns) -> Batch:
+    if header is None:
+        header = lan_header.make(body.state)
+    template = bytes(Msg.encode(header, body))
+    if numpy is not None:
+        return _encode_numpy(template, targets, layout, columns)
+    return _encode_struct(template, targets, layout, columns)
+
+
+def _targets(targets: Targets) -> List[bytes]:
+    padded = []
+    for target in targets:
+        target = bytes.fromhex(target) if isinstance(target, str) else bytes(target)
+        if len(target) > 8:
+            raise ValueError("target {} is longer than 8 bytes".format(target.hex()))
+        padded.append(target.ljust(8, b"\0"))
+    return padded
+
+
+def _column(name: str, column: Column, count: int) -> List[int]:
+    if isinstance(column, numbers.Integral):
+        return [int(column)] * count
+    column = [int(value) for value in column]
+    if len(column) != count:
+        raise ValueError(
+            "{} has {} values for {} targets".format(name, len(column), count)
+        )
+    return column
+
+
+def _encode_struct(template, targets, layout, columns) -> Batch:
+    targets = _targets(targets)
+    count = len(targets)
+    size = len(template)
+    data = bytearray(template * count)
+    fields = Struct("<" + "".join(fmt for (_, _, fmt) in layout))
+    start = layout[0][1]
+    values = zip(*(_column(name, columns[name], count) for (name, _, _) in layout))
+    for offset, target, row in zip(range(0, count * size, size), targets, values):
+        data[offset + TARGET.start : offset + TARGET.stop] = target
+        fields.pack_into(data, offset + start, *row)
+    return Batch(bytes(data), size)
+
+
+def _encode_numpy(template, targets, layout, columns) -> Batch:
+    if not isinstance(targets, numpy.ndarray):
+        targets = numpy.frombuffer(b"".join(_targets(targets)), numpy.uint8)
+        targets = targets.reshape(-1, 8)
+    elif targets.ndim != 2 or targets.shape[1] != 8:
+        raise ValueError("targets is a {} array, not (n, 8)".format(targets.shape))
+    count = len(targets)
+    data = numpy.tile(numpy.frombuffer(template, numpy.uint8), (count, 1))
+    data[:, TARGET] = targets
+    for name, offset, fmt in layout:
+        dtype = numpy.dtype("<u{}".format(Struct(fmt).size))
+        column = numpy.asarray(columns[name], dtype)
+        if column.ndim and column.shape != (count,):
+            raise ValueError(
+                "{} has {} values for {} targets".format(name, len(column), count)
+            )
+        column = numpy.broadcast_to(column, count)
+        data[:, offset : offset + dtype.itemsize] = (
+            numpy.ascontiguousarray(column)
+            .view(numpy.uint8)
+            .reshape(count, dtype.itemsize)
+        )
+    return Batch(data.tobytes(), len(template))
@@ -1 +1,24 @@
-from lifx.lan.client import asynchronous
+import importlib
+
+_submodules = {
+    "asynchronous",
+    "metrics",
+    "queue",
+    "rate",
+    "replies",
+    "shared",
+    "subscription",
+    "synchronous",
+    "sweep",
+    "telemetry",
+}
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module("{}.{}".format(__name__, name))
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules)
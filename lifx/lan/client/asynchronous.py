@@ -1,65 +1,172 @@
 import asyncio
 import logging
 
+from collections import Counter
+from time import perf_counter
 from typing import Iterable, Tuple, Any
-from lifx.lan import Msg
+from lifx.lan import Msg, Header
+from lifx.lan.header import Reject, validate
+from lifx.lan.client.metrics import Metrics
+from lifx.lan.client.rate import Rates
+from lifx.lan.client.queue import Policy, Priority, Queue, priority as priority_of
+from lifx.trace import tracer
 
 
 class Client(asyncio.DatagramProtocol):
     """
     An asynchronous trivial client example
 
+    With metrics or retries, every message requiring a reply is waited for:
+    a message without reply after timeout seconds is sent again up to retries
+    times, then dropped.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> class Device(asyncio.DatagramProtocol):
+    ...     # acknowledges a message only when it is sent again
+    ...     def __init__(self):
+    ...         self.seen = set()
+    ...     def connection_made(self, transport):
+    ...         self.transport = transport
+    ...     def datagram_received(self, data, addr):
+    ...         (request, _) = lifx.lan.Msg.decode_bytes(data)
+    ...         if request.field.sequence not in self.seen:
+    ...             self.seen.add(request.field.sequence)
+    ...             return
+    ...         header = lifx.lan.header.make("acknowledgement")
+    ...         header.field.sequence = request.field.sequence
+    ...         self.transport.sendto(bytes(lifx.lan.Msg.encode(header, None)), addr)
+    >>> async def main():
+    ...     loop = asyncio.get_running_loop()
+    ...     (device, _) = await loop.create_datagram_endpoint(Device, local_addr=("127.0.0.1", 0))
+    ...     metrics = lifx.lan.client.metrics.Metrics()
+    ...     (transport, client) = await loop.create_datagram_endpoint(
+    ...         lambda: lifx.lan.client.asynchronous.Client([], metrics, timeout=0.05, retries=1),
+    ...         local_addr=("127.0.0.1", 0),
+    ...     )
+    ...     body = lifx.lan.light.SetPower()
+    ...     header = lifx.lan.header.make(body.state)
+    ...     address = device.get_extra_info("sockname")
+    ...     await client.write_many([address, address, ("127.0.0.2", 9)], header, body)
+    ...     await asyncio.sleep(0.3)
+    ...     transport.close()
+    ...     device.close()
+    ...     return metrics.snapshot()
+    >>> snapshot = asyncio.run(main())
+    >>> counters = ("sent", "received", "timeouts", "retries", "drops")
+    >>> [snapshot["127.0.0.1"][counter] for counter in counters]
+    [2, 2, 2, 2, 0]
+    >>> [snapshot["127.0.0.2"][counter] for counter in counters]
+    [1, 0, 2, 1, 1]
+
+    With rates, the messages to a device, retries included, are spaced out
+    at its rate, halved on every timeout:
+
+    >>> class Silent(asyncio.DatagramProtocol):
+    ...     def __init__(self):
+    ...         self.times = []
+    ...     def datagram_received(self, data, addr):
+    ...         self.times.append(asyncio.get_running_loop().time())
+    >>> async def main():
+    ...     loop = asyncio.get_running_loop()
+    ...     (device, silent) = await loop.create_datagram_endpoint(Silent, local_addr=("127.0.0.1", 0))
+    ...     rates = lifx.lan.client.rate.Rates(initial=20, maximum=20)
+    ...     (transport, client) = await loop.create_datagram_endpoint(
+    ...         lambda: lifx.lan.client.asynchronous.Client([], timeout=0.02, retries=1, rates=rates),
+    ...         local_addr=("127.0.0.1", 0),
+    ...     )
+    ...     body = lifx.lan.light.SetPower()
+    ...     address = device.get_extra_info("sockname")
+    ...     await client.write_many([address] * 3, lifx.lan.header.make(body.state), body)
+    ...     await asyncio.sleep(0.6)
+    ...     transport.close()
+    ...     device.close()
+    ...     return silent.times, rates.rate("127.0.0.1")
+    >>> (times, rate) = asyncio.run(main())
+    >>> len(times), rate
+    (6, 1)
+    >>> min(later - earlier for (earlier, later) in zip(times, times[1:])) > 0.045
+    True
+
     Example::
 
-        >>> import asyncio
-        >>> import lifx
-        >>> import sys
-        >>>
-        >>> async def process_responses(msg):
-        ...     is_on = False
-        ...     (header, body) = msg.decode()
-        ...     if header.type == lifx.lan.Header.State.acknowledgement:
-        ...         print("got an ack")
-        ...     elif header.type == lifx.lan.Header.State.state_power_light:
-        ...         is_on = body.level == body.ON
-        ...         if is_on:
-        ...             print("got light is powered")
-        ...         else:
-        ...             print("got light is not powered")
-        >>>
-        >>>
-        >>> async def create_datagram_endpoint():
-        ...     loop_ = asyncio.get_event_loop()
-        ...     transport_, protocol_ = await loop_.create_datagram_endpoint(lambda: Client([process_responses]),
-        ...                                                                  local_addr=('0.0.0.0', 56700))
-        ...     return transport_, protocol_
-        >>>
-        >>> loop = asyncio.get_event_loop()
-        >>> transport, protocol = loop.run_until_complete(loop.create_task(create_datagram_endpoint()))
-        >>>
-        >>> body = lifx.lan.light.SetPower()
-        >>> body.field.level = lifx.lan.light.SetPower.ON
-        >>> header = lifx.lan.header.make(body.state)
-        >>> msg_on = lifx.lan.Msg.encode(header, body, '172.31.10.245', 56700)
-        >>> body.field.level = lifx.lan.light.SetPower.OFF
-        >>> msg_off = lifx.lan.Msg.encode(header, body, '172.31.10.245', 56700)
-        >>> body = lifx.lan.light.GetPower()
-        >>> header = lifx.lan.header.make(body.state)
-        >>> msg_get_power = lifx.lan.Msg.encode(header, body, '172.31.10.245', 56700)
-        >>> loop.run_until_complete(loop.create_task(protocol.write([msg_on, msg_get_power, msg_off, msg_get_power])))
-        got an ack
-        got an ack
-        got light is powered
-        got an ack
-        got an ack
-        got light is not powered
+        import asyncio
+        import lifx
+
+        async def process_responses(msg):
+            (header, body) = msg.decode()
+            if header.type == lifx.lan.Header.State.acknowledgement:
+                print("got an ack")
+            elif header.type == lifx.lan.Header.State.state_power_light:
+                if body.level == body.ON:
+                    print("got light is powered")
+                else:
+                    print("got light is not powered")
+
+        loop = asyncio.get_event_loop()
+        transport, protocol = loop.run_until_complete(
+            loop.create_datagram_endpoint(
+                lambda: lifx.lan.client.asynchronous.Client([process_responses]),
+                local_addr=("0.0.0.0", 56700),
+            )
+        )
 
+        body = lifx.lan.light.SetPower()
+        body.field.level = lifx.lan.light.SetPower.ON
+        header = lifx.lan.header.make(body.state)
+        msg_on = lifx.lan.Msg.encode(header, body, "172.31.10.245", 56700)
+        body.field.level = lifx.lan.light.SetPower.OFF
+        msg_off = lifx.lan.Msg.encode(header, body, "172.31.10.245", 56700)
+        body = lifx.lan.light.GetPower()
+        header = lifx.lan.header.make(body.state)
+        msg_get_power = lifx.lan.Msg.encode(header, body, "172.31.10.245", 56700)
+        loop.run_until_complete(
+            protocol.write([msg_on, msg_get_power, msg_off, msg_get_power])
+        )
     """
 
-    def __init__(self, tasks: Iterable[Any]):
+    def __init__(
+        self,
+        tasks: Iterable[Any],
+        metrics: Metrics = None,
+        timeout: float = 1,
+        retries: int = 0,
+        source: int = 0,
+        queue_size: int = 1024,
+        policy: Policy = Policy.drop_old,
+        rates: Rates = None,
+    ):
+        """
+        :param tasks: coroutine functions called with every received lifx.lan.Msg
+        :param metrics: an optional lifx.lan.client.metrics.Metrics collecting per device
+            round trip times, send/receive counts, timeouts, retries and drops
+        :param timeout: seconds to wait for an acknowledgement or a response
+        :param retries: how many times a message without reply is sent again
+        :param source: the protocol source stamped on outgoing messages, devices reply
+            with the same source; 0 keeps the one in the message header
+        :param queue_size: how many messages may wait while the transport asks to pause writing
+        :param policy: a lifx.lan.client.queue.Policy, what to drop when the queue is full
+        :param rates: an optional lifx.lan.client.rate.Rates pacing every device at a rate
+            adapted to its acknowledgement timeouts and round trip times;
+            at most queue_size messages wait for their slot
+        """
         self._loop = asyncio.get_event_loop()
         self._transport = None
         self._tasks = tasks
+        self._metrics = metrics
+        self._timeout = timeout
+        self._retries = retries
+        self._rates = rates
+        self._tracking = metrics is not None or retries > 0 or rates is not None
+        self._sequence = 0
+        self._pending = {}
+        self._queue = Queue(queue_size, policy)
+        self._queue_size = queue_size
+        self._scheduled = 0
+        self._writable = True
+        self.source = source
+        # malformed or foreign datagrams dropped on receive, by lifx.lan.header.Reject reason
+        self.rejects = Counter()
 
         self.logger = logging.getLogger(__name__)
 
@@ -70,18 +177,300 @@ class Client(asyncio.DatagramProtocol):
     def connection_lost(self, exc):
         self.logger.error("Connection lost: {}".format(str(exc)))
         self._transport = None
+        for pending in self._pending.values():
+            if pending.timer:
+                pending.timer.cancel()
+        self._pending.clear()
+        self._queue.clear()
+
+    def pause_writing(self):
+        """
+        Called when the transport buffer is full: messages wait in the queue
+        until resume_writing sends them, most important first
+
+        >>> import asyncio
+        >>> import lifx
+        >>> class Device(asyncio.DatagramProtocol):
+        ...     def __init__(self):
+        ...         self.received = []
+        ...     def datagram_received(self, data, addr):
+        ...         self.received.append(lifx.lan.Msg.decode_bytes(data)[0].type.name)
+        >>> async def main():
+        ...     loop = asyncio.get_running_loop()
+        ...     (device, recorder) = await loop.create_datagram_endpoint(Device, local_addr=("127.0.0.1", 0))
+        ...     metrics = lifx.lan.client.metrics.Metrics()
+        ...     (transport, client) = await loop.create_datagram_endpoint(
+        ...         lambda: lifx.lan.client.asynchronous.Client([], metrics, queue_size=2),
+        ...         local_addr=("127.0.0.1", 0),
+        ...     )
+        ...     address = device.get_extra_info("sockname")
+        ...     client.pause_writing()
+        ...     for body in (lifx.lan.light.SetWaveform(), lifx.lan.light.SetColor(), lifx.lan.light.SetPower()):
+        ...         await client.write_many([address], lifx.lan.header.make(body.state), body)
+        ...     await asyncio.sleep(0.05)
+        ...     paused = list(recorder.received)
+        ...     client.resume_writing()
+        ...     await asyncio.sleep(0.05)
+        ...     transport.close()
+        ...     device.close()
+        ...     return paused, recorder.received, metrics.snapshot()["127.0.0.1"]["drops"]
+        >>> (paused, received, drops) = asyncio.run(main())
+        >>> paused
+        []
+
+        The waveform made room for the power command in the full queue:
+
+        >>> received, drops
+        (['set_power_light', 'set_color_light'], 1)
+        """
+        self._writable = False
+
+    def resume_writing(self):
+        self._writable = True
+        while self._writable and self._queue and self._transport:
+            (data, address, retry) = self._queue.get()
+            self._sendto(data, address, retry)
 
     def error_received(self, exc):
         self.logger.error("Error received: {}".format(str(exc)))
 
     def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        start = tracer.enabled and perf_counter()
+        reject = validate(data)
+        if reject:
+            self._rejected(data, addr, reject)
+            return
+        if self._tracking:
+            self._replied(addr[0], Header.from_buffer_copy(data).field.sequence)
         msg = Msg.from_bytes(data, addr=addr[0], port=addr[1])
-        self.logger.info("read    {}".format(str(msg)))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("read    {}".format(str(msg)))
         for task in self._tasks:
             self._loop.create_task(task(msg))
+        if start:
+            tracer.emit("datagram", start, len(data))
 
-    async def write(self, msgs: Iterable["lifx.Msg"]):
+    async def write(
+        self,
+        msgs: Iterable["lifx.Msg"],
+        interval: float = 1,
+        priority: Priority = None,
+    ):
+        """
+        Send messages to their (addr, port), one every interval seconds
+
+        While the transport asks to pause writing messages wait in a bounded queue,
+        power commands ahead of colors and colors ahead of waveform effects.
+
+        :param msgs: a list of lifx.Msg
+        :param interval: seconds to wait after each message
+        :param priority: a lifx.lan.client.queue.Priority, by default inferred from the message type
+        """
         for msg in msgs:
-            data = bytes(msg)
-            self._transport.sendto(data, (msg.addr, msg.port))
-            await asyncio.sleep(1)
+            self._send(bytes(msg), (msg.addr, msg.port), priority)
+            await asyncio.sleep(interval)
+
+    async def write_many(
+        self,
+        addresses: Iterable[Tuple[str, int]],
+        header: "lifx.lan.Header",
+        body: Any,
+        priority: Priority = None,
+    ):
+        """
+        Send the same message to many devices at once, for example to a whole group::
+
+            await client.write_many(index.group(group), header, body)
+
+        :param addresses: a list of (addr, port)
+        :param header: a lifx.lan.Header
+        :param body: a lifx lan payload
+        :param priority: a lifx.lan.client.queue.Priority, by default inferred from the message type
+        """
+        data = bytes(Msg.encode(header, body))
+        for address in addresses:
+            self._send(data, address, priority)
+
+    async def write_batch(
+        self,
+        addresses: Iterable[Tuple[str, int]],
+        batch: "lifx.lan.batch.Batch",
+        priority: Priority = None,
+    ):
+        """
+        Send a different message to every device at once, the first message of batch
+        to the first address and so on::
+
+            batch = lifx.lan.batch.set_color(targets, hues, saturations, brightnesses, kelvins)
+            await client.write_batch(addresses, batch)
+
+        :param addresses: a list of (addr, port), as long as batch
+        :param batch: a lifx.lan.batch.Batch
+        :param priority: a lifx.lan.client.queue.Priority, by default inferred from the message type
+        """
+        for address, data in zip(addresses, batch):
+            self._send(data, address, priority)
+
+    def _send(
+        self,
+        data: bytes,
+        address: Tuple[str, int],
+        priority: Priority = None,
+        retry: "_Pending" = None,
+    ):
+        if self._rates:
+            delay = self._rates.reserve(address[0], self._loop.time())
+            if delay > 0:
+                if self._scheduled >= self._queue_size:
+                    self._dropped(address, retry)
+                else:
+                    self._scheduled += 1
+                    self._loop.call_later(
+                        delay, self._paced, data, address, priority, retry
+                    )
+                return
+        self._enqueue(data, address, priority, retry)
+
+    def _paced(
+        self,
+        data: bytes,
+        address: Tuple[str, int],
+        priority: Priority,
+        retry: "_Pending",
+    ):
+        self._scheduled -= 1
+        if self._transport:
+            self._enqueue(data, address, priority, retry)
+
+    def _enqueue(
+        self,
+        data: bytes,
+        address: Tuple[str, int],
+        priority: Priority,
+        retry: "_Pending",
+    ):
+        if self._writable and not self._queue:
+            self._sendto(data, address, retry)
+            return
+        if priority is None:
+            priority = priority_of(data)
+        dropped = self._queue.put((data, address, retry), priority)
+        if dropped:
+            self._dropped(dropped[1], dropped[2])
+
+    def _dropped(self, address: Tuple[str, int], retry: "_Pending" = None):
+        if retry is not None and self._pending.get(retry.key) is retry:
+            del self._pending[retry.key]
+        if self._metrics:
+            self._metrics.drop(address[0])
+        self.logger.warning("drop    queued message to {}".format(address[0]))
+
+    def _rejected(self, data: bytes, address: Tuple[str, int], reject: Reject):
+        self.rejects[reject] += 1
+        if self._metrics:
+            self._metrics.reject(address[0])
+        self.logger.debug(
+            "reject  {} bytes from {}: {}".format(len(data), address[0], reject.name)
+        )
+
+    def _sendto(self, data: bytes, address: Tuple[str, int], retry: "_Pending" = None):
+        if retry is not None:
+            if self._pending.get(retry.key) is not retry:
+                # answered while waiting for its slot
+                return
+            # already stamped, its timeout and round trip run from this copy
+            retry.sent_at = self._loop.time()
+            retry.timer = self._loop.call_later(
+                self._timeout, self._expired, retry.key, retry
+            )
+        elif self.source or self._tracking:
+            data = self._stamp(data, address)
+        start = tracer.enabled and perf_counter()
+        self._transport.sendto(data, address)
+        if start:
+            tracer.emit("sendto", start, len(data))
+
+    def _stamp(self, data: bytes, addr: Tuple[str, int]) -> bytes:
+        data = bytearray(data)
+        header = Header.from_buffer(data)
+        if self.source:
+            header.field.source = self.source
+        if self._tracking:
+            self._track(header, data, addr)
+        return data
+
+    def _track(self, header: Header, data: bytearray, addr: Tuple[str, int]):
+        """
+        Stamp a sequence number on an outgoing message, unless the caller
+        already did, and when a reply is required wait for it
+        """
+        if not header.field.sequence:
+            self._sequence = self._sequence % 255 + 1
+            header.field.sequence = self._sequence
+        if self._metrics:
+            self._metrics.sent(addr[0])
+        if header.field.ack_required or header.field.res_required:
+            key = (addr[0], header.field.sequence)
+            # the sequence wraps at 256: a message still waiting with it is given up
+            superseded = self._pending.get(key)
+            if superseded and superseded.timer:
+                superseded.timer.cancel()
+            pending = _Pending(bytes(data), addr, key, self._retries, self._loop.time())
+            pending.timer = self._loop.call_later(
+                self._timeout, self._expired, key, pending
+            )
+            self._pending[key] = pending
+
+    def _replied(self, target: str, sequence: int):
+        if self._metrics:
+            self._metrics.received(target)
+        pending = self._pending.pop((target, sequence), None)
+        if pending:
+            if pending.timer:
+                pending.timer.cancel()
+            rtt = self._loop.time() - pending.sent_at
+            if self._metrics:
+                self._metrics.rtt(target, rtt)
+            if self._rates:
+                self._rates.acked(target, rtt)
+
+    def _expired(self, key: Tuple[str, int], pending: "_Pending"):
+        if self._pending.get(key) is not pending:
+            return
+        if self._metrics:
+            self._metrics.timeout(key[0])
+        if self._rates:
+            self._rates.timeout(key[0])
+        if pending.retries and self._transport:
+            pending.retries -= 1
+            pending.timer = None
+            # retries wait for the device pace and the queue like any message
+            self._send(pending.data, pending.addr, retry=pending)
+            if self._metrics:
+                self._metrics.retry(key[0])
+            self.logger.info("retry   {} to {}".format(key[1], key[0]))
+        else:
+            del self._pending[key]
+            if self._metrics:
+                self._metrics.drop(key[0])
+            self.logger.warning("drop    {} to {}".format(key[1], key[0]))
+
+
+class _Pending(object):
+
+    __slots__ = ("data", "addr", "key", "retries", "sent_at", "timer")
+
+    def __init__(
+        self,
+        data: bytes,
+        addr: Tuple[str, int],
+        key: Tuple[str, int],
+        retries: int,
+        sent_at: float,
+    ):
+        self.data = data
+        self.addr = addr
+        self.key = key
+        self.retries = retries
+        self.sent_at = sent_at
+        self.timer = None
@@ -0,0 +1,152 @@
+import bisect
+
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+Hook = Callable[[str, str, Any], None]
+
+
+class Target(object):
+    """
+    Counters and round trip time histogram of a single device
+    """
+
+    __slots__ = (
+        "sent",
+        "received",
+        "timeouts",
+        "retries",
+        "drops",
+        "rejects",
+        "rtt_count",
+        "rtt_sum",
+        "histogram",
+    )
+
+    def __init__(self, buckets: int):
+        self.sent = 0
+        self.received = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.drops = 0
+        self.rejects = 0
+        self.rtt_count = 0
+        self.rtt_sum = 0.0
+        self.histogram = [0] * (buckets + 1)
+
+    @property
+    def rtt(self) -> Optional[float]:
+        """
+        Mean round trip time in seconds, None if nothing has been measured yet
+        """
+        return self.rtt_sum / self.rtt_count if self.rtt_count else None
+
+
+class Metrics(object):
+    """
+    Per device (IP address) latency, loss and retry metrics of a client
+
+    Pass an instance to lifx.lan.client.asynchronous.Client and either read
+    snapshot() periodically or give it a hook called as hook(target, event, value)
+    for every event: "sent", "received", "retry", "timeout", "drop", "reject" and "rtt"
+    (value is the round trip time in seconds, 1 otherwise).
+
+    >>> import lifx
+    >>> events = []
+    >>> metrics = lifx.lan.client.metrics.Metrics(lambda *event: events.append(event))
+    >>> metrics.sent("192.168.1.10")
+    >>> metrics.received("192.168.1.10")
+    >>> metrics.rtt("192.168.1.10", 0.02)
+    >>> metrics.timeout("192.168.1.10")
+    >>> metrics.retry("192.168.1.10")
+    >>> metrics.drop("192.168.1.10")
+    >>> events[-1]
+    ('192.168.1.10', 'drop', 1)
+    >>> metrics.reject("192.168.1.10")
+    >>> snapshot = metrics.snapshot()["192.168.1.10"]
+    >>> snapshot["sent"], snapshot["received"], snapshot["timeouts"], snapshot["retries"], snapshot["drops"]
+    (1, 1, 1, 1, 1)
+    >>> snapshot["rejects"]
+    1
+    >>> snapshot["rtt"]
+    0.02
+    >>> snapshot["histogram"][0.025]
+    1
+    >>> snapshot["histogram"][float("inf")]
+    0
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self, hook: Hook = None, buckets: Iterable[float] = BUCKETS):
+        """
+        :param hook: an optional callable(target, event, value)
+        :param buckets: upper bounds, in seconds, of the round trip time histogram
+        """
+        self._hook = hook
+        self._buckets = tuple(sorted(buckets))
+        self._targets = {}  # type: Dict[str, Target]
+
+    def target(self, target: str) -> Target:
+        try:
+            return self._targets[target]
+        except KeyError:
+            self._targets[target] = Target(len(self._buckets))
+            return self._targets[target]
+
+    def sent(self, target: str):
+        self.target(target).sent += 1
+        if self._hook:
+            self._hook(target, "sent", 1)
+
+    def received(self, target: str):
+        self.target(target).received += 1
+        if self._hook:
+            self._hook(target, "received", 1)
+
+    def retry(self, target: str):
+        self.target(target).retries += 1
+        if self._hook:
+            self._hook(target, "retry", 1)
+
+    def timeout(self, target: str):
+        self.target(target).timeouts += 1
+        if self._hook:
+            self._hook(target, "timeout", 1)
+
+    def drop(self, target: str):
+        self.target(target).drops += 1
+        if self._hook:
+            self._hook(target, "drop", 1)
+
+    def reject(self, target: str):
+        self.target(target).rejects += 1
+        if self._hook:
+            self._hook(target, "reject", 1)
+
+    def rtt(self, target: str, seconds: float):
+        stats = self.target(target)
+        stats.rtt_count += 1
+        stats.rtt_sum += seconds
+        stats.histogram[bisect.bisect_left(self._buckets, seconds)] += 1
+        if self._hook:
+            self._hook(target, "rtt", seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        :return: a dict target -> counters, mean rtt and rtt histogram (upper bound -> count)
+        """
+        bounds = self._buckets + (float("inf"),)
+        return {
+            target: {
+                "sent": stats.sent,
+                "received": stats.received,
+                "timeouts": stats.timeouts,
+                "retries": stats.retries,
+                "drops": stats.drops,
+                "rejects": stats.rejects,
+                "rtt": stats.rtt,
+                "histogram": dict(zip(bounds, stats.histogram)),
+            }
+            for target, stats in self._targets.items()
+        }
@@ -0,0 +1,103 @@
+from collections import deque
+from enum import IntEnum
+from typing import Any, Deque, List, Optional
+
+from lifx.lan.header import Header
+
+
+class Priority(IntEnum):
+    critical = 0
+    normal = 1
+    effect = 2
+
+
+class Policy(IntEnum):
+    drop_new = 0
+    drop_old = 1
+
+
+PRIORITIES = {
+    Header.State.set_power: Priority.critical,
+    Header.State.set_power_light: Priority.critical,
+    Header.State.set_waveform_light: Priority.effect,
+}
+
+
+def priority(data: bytes) -> Priority:
+    """
+    Power commands go first, waveform effects last
+
+    :param data: an encoded message
+    :return: a lifx.lan.client.queue.Priority
+    """
+    return PRIORITIES.get(Header.from_buffer_copy(data).field.type, Priority.normal)
+
+
+class Queue(object):
+    """
+    A bounded queue of outgoing messages, served by priority then in order
+
+    When full, Policy.drop_new refuses the incoming message while Policy.drop_old
+    makes room by dropping the oldest message of the least important priority,
+    provided it is not more important than the incoming one.
+
+    >>> import lifx
+    >>> from lifx.lan.client.queue import Priority, Policy, Queue
+    >>> queue = Queue(maxsize=2, policy=Policy.drop_old)
+    >>> queue.put("frame 1", Priority.effect)
+    >>> queue.put("frame 2", Priority.effect)
+    >>> queue.put("power off", Priority.critical)
+    'frame 1'
+    >>> queue.put("color", Priority.normal)
+    'frame 2'
+    >>> queue.put("frame 3", Priority.effect)
+    'frame 3'
+    >>> [queue.get(), queue.get()]
+    ['power off', 'color']
+    >>> len(queue)
+    0
+    """
+
+    def __init__(self, maxsize: int = 1024, policy: Policy = Policy.drop_old):
+        """
+        :param maxsize: the maximum number of queued messages
+        :param policy: a lifx.lan.client.queue.Policy applied when full
+        """
+        self._maxsize = maxsize
+        self._policy = policy
+        self._queues = [deque() for _ in Priority]  # type: List[Deque[Any]]
+        self._size = 0
+
+    def put(self, item: Any, priority: Priority) -> Optional[Any]:
+        """
+        :return: the item dropped to respect maxsize, if any
+        """
+        dropped = None
+        if self._size >= self._maxsize:
+            if self._policy == Policy.drop_new:
+                return item
+            for queue in reversed(self._queues[priority:]):
+                if queue:
+                    dropped = queue.popleft()
+                    self._size -= 1
+                    break
+            else:
+                return item
+        self._queues[priority].append(item)
+        self._size += 1
+        return dropped
+
+    def get(self) -> Any:
+        for queue in self._queues:
+            if queue:
+                self._size -= 1
+                return queue.popleft()
+        raise IndexError("get from an empty queue")
+
+    def clear(self):
+        for queue in self._queues:
+            queue.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
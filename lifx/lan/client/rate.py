@@ -0,0 +1,118 @@
+from typing import Dict, Optional
+
+
+class Controller(object):
+    """
+    The send rate of a single device, in messages per second
+    """
+
+    __slots__ = ("rate", "rtt", "min_rtt", "next_at")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.rtt = None  # type: Optional[float]
+        self.min_rtt = None  # type: Optional[float]
+        self.next_at = 0.0
+
+
+class Rates(object):
+    """
+    Per device (IP address) AIMD send rate control
+
+    Every acknowledged message measuring a round trip time close to the best one seen
+    adds increase messages per second, up to maximum; a round trip time above
+    tolerance times the best one keeps the rate, a timeout multiplies it by decrease,
+    down to minimum. Pass an instance to lifx.lan.client.asynchronous.Client
+    to pace the messages of every device at its own rate.
+
+    >>> import lifx
+    >>> rates = lifx.lan.client.rate.Rates(initial=10, minimum=1, maximum=12, increase=1, decrease=0.5)
+    >>> rates.acked("192.168.1.10", 0.010)
+    >>> rates.rate("192.168.1.10")
+    11
+    >>> rates.acked("192.168.1.10", 0.030)
+    >>> rates.rate("192.168.1.10")
+    11
+    >>> rates.acked("192.168.1.10", 0.011)
+    >>> rates.acked("192.168.1.10", 0.011)
+    >>> rates.rate("192.168.1.10")
+    12
+    >>> rates.timeout("192.168.1.10")
+    >>> rates.rate("192.168.1.10")
+    6.0
+    >>> [round(rates.reserve("192.168.1.10", 100.0), 3) for _ in range(3)]
+    [0.0, 0.167, 0.333]
+    >>> rates.snapshot()["192.168.1.10"]["rate"]
+    6.0
+    """
+
+    def __init__(
+        self,
+        initial: float = 10,
+        minimum: float = 1,
+        maximum: float = 20,
+        increase: float = 1,
+        decrease: float = 0.5,
+        tolerance: float = 2,
+    ):
+        """
+        :param initial: messages per second of a device never seen before
+        :param minimum: the lowest rate
+        :param maximum: the highest rate, Lifx recommends no more than 20 messages per second
+        :param increase: messages per second added after every timely acknowledgement
+        :param decrease: rate multiplier applied after every timeout
+        :param tolerance: round trip times above tolerance times the best one stop increases
+        """
+        self._initial = initial
+        self._minimum = minimum
+        self._maximum = maximum
+        self._increase = increase
+        self._decrease = decrease
+        self._tolerance = tolerance
+        self._controllers = {}  # type: Dict[str, Controller]
+
+    def controller(self, target: str) -> Controller:
+        try:
+            return self._controllers[target]
+        except KeyError:
+            self._controllers[target] = Controller(self._initial)
+            return self._controllers[target]
+
+    def rate(self, target: str) -> float:
+        return self.controller(target).rate
+
+    def acked(self, target: str, rtt: float):
+        controller = self.controller(target)
+        controller.rtt = (
+            rtt if controller.rtt is None else 0.875 * controller.rtt + 0.125 * rtt
+        )
+        if controller.min_rtt is None or rtt < controller.min_rtt:
+            controller.min_rtt = rtt
+        if rtt <= controller.min_rtt * self._tolerance:
+            controller.rate = min(self._maximum, controller.rate + self._increase)
+
+    def timeout(self, target: str):
+        controller = self.controller(target)
+        controller.rate = max(self._minimum, controller.rate * self._decrease)
+
+    def reserve(self, target: str, now: float) -> float:
+        """
+        Book the next send slot of a device
+
+        :param target: the device IP address
+        :param now: the current loop time
+        :return: seconds to wait before sending
+        """
+        controller = self.controller(target)
+        slot = max(now, controller.next_at)
+        controller.next_at = slot + 1 / controller.rate
+        return slot - now
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        :return: a dict target -> current rate (messages per second) and smoothed rtt (seconds)
+        """
+        return {
+            target: {"rate": controller.rate, "rtt": controller.rtt}
+            for target, controller in self._controllers.items()
+        }
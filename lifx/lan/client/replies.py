@@ -0,0 +1,110 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class Replies(object):
+    """
+    Requests waiting for their reply, each under a key the reply can be told by:
+    a (addr, reply type), an echo payload, a sequence number...
+
+    The client task owning the replies resolves a key with every reply it gets,
+    requesters wait at most timeout seconds and get None when nothing came.
+    Waiting again on a key still waiting gives the first request up.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> async def main():
+    ...     replies = lifx.lan.client.replies.Replies()
+    ...     window = asyncio.Semaphore(1)
+    ...     async def send():
+    ...         asyncio.get_running_loop().call_soon(replies.resolve, "ping", "pong")
+    ...     answered = await replies.request("ping", send, timeout=1, window=window)
+    ...     lost = await replies.request("lost", send, timeout=0.01, window=window)
+    ...     return answered, lost, replies.resolve("ping", "late"), len(replies)
+    >>> asyncio.run(main())
+    ('pong', None, False, 0)
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None):
+        """
+        :param loop: the event loop of the requests, the current one when None
+        """
+        self._loop = loop or asyncio.get_event_loop()
+        self._waiting = {}  # type: Dict[Hashable, asyncio.Future]
+
+    def expect(self, key: Hashable) -> asyncio.Future:
+        """
+        :param key: what the reply is told by
+        :return: a future resolved with the reply, wait for it with wait()
+        """
+        superseded = self._waiting.get(key)
+        if superseded and not superseded.done():
+            superseded.set_result(None)
+        future = self._waiting[key] = self._loop.create_future()
+        return future
+
+    def resolve(self, key: Hashable, reply: Any) -> bool:
+        """
+        :param key: what the reply is told by
+        :param reply: the value handed to the request
+        :return: False when no request waits for the key
+        """
+        future = self._waiting.pop(key, None)
+        if future is None or future.done():
+            return False
+        future.set_result(reply)
+        return True
+
+    async def wait(
+        self, key: Hashable, future: asyncio.Future, timeout: float
+    ) -> Optional[Any]:
+        """
+        :param key: the key given to expect()
+        :param future: the future expect() returned
+        :param timeout: seconds to wait for the reply
+        :return: the reply, None when it did not come in time
+        """
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._forget(key, future)
+
+    async def request(
+        self,
+        key: Hashable,
+        send: Callable[[], Awaitable],
+        timeout: float,
+        window: asyncio.Semaphore = None,
+    ) -> Optional[Any]:
+        """
+        Send a request and wait for its reply
+
+        :param key: what the reply is told by
+        :param send: a coroutine function sending the request
+        :param timeout: seconds to wait for the reply
+        :param window: a semaphore bounding the requests waiting for a reply
+        :return: the reply, None when it did not come in time
+        """
+        if window is None:
+            return await self._request(key, send, timeout)
+        async with window:
+            return await self._request(key, send, timeout)
+
+    def __len__(self) -> int:
+        return len(self._waiting)
+
+    async def _request(self, key, send, timeout):
+        future = self.expect(key)
+        try:
+            await send()
+        except BaseException:
+            self._forget(key, future)
+            raise
+        return await self.wait(key, future, timeout)
+
+    def _forget(self, key, future):
+        if self._waiting.get(key) is future:
+            del self._waiting[key]
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import random
+
+from typing import Any, Dict, Optional, Tuple
+
+from lifx.lan.client.asynchronous import Client
+
+
+Address = Tuple[str, int]
+
+
+class Shared(asyncio.DatagramProtocol):
+    """
+    A single socket shared by many logical clients
+
+    Every attached lifx.lan.client.asynchronous.Client gets its own protocol source,
+    stamped on the messages it sends; devices reply with the same source, so each
+    reply is handed (and decoded) to its client only. Datagrams with a source no
+    client owns are dropped and counted in unrouted.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> class Device(asyncio.DatagramProtocol):
+    ...     def connection_made(self, transport):
+    ...         self.transport = transport
+    ...     def datagram_received(self, data, addr):
+    ...         (request, _) = lifx.lan.Msg.decode_bytes(data)
+    ...         body = lifx.lan.light.StatePower()
+    ...         header = lifx.lan.header.make(body.state)
+    ...         header.field.source = request.field.source
+    ...         self.transport.sendto(bytes(lifx.lan.Msg.encode(header, body)), addr)
+    >>> async def main():
+    ...     loop = asyncio.get_running_loop()
+    ...     (device, _) = await loop.create_datagram_endpoint(Device, local_addr=("127.0.0.1", 0))
+    ...     address = device.get_extra_info("sockname")
+    ...     (transport, shared) = await loop.create_datagram_endpoint(
+    ...         lifx.lan.client.shared.Shared, local_addr=("127.0.0.1", 0)
+    ...     )
+    ...     replies = {"first": [], "second": []}
+    ...     async def first(msg):
+    ...         replies["first"].append(msg.decode()[0].field.source)
+    ...     async def second(msg):
+    ...         replies["second"].append(msg.decode()[0].field.source)
+    ...     clients = [
+    ...         shared.attach(lifx.lan.client.asynchronous.Client([first])),
+    ...         shared.attach(lifx.lan.client.asynchronous.Client([second])),
+    ...     ]
+    ...     body = lifx.lan.light.GetPower()
+    ...     await clients[0].write_many([address], lifx.lan.header.make(body.state), body)
+    ...     await clients[1].write_many([address, address], lifx.lan.header.make(body.state), body)
+    ...     await clients[1].write_many([address], lifx.lan.header.make(body.state), body)
+    ...     stray = lifx.lan.light.StatePower()
+    ...     stray = bytes(lifx.lan.Msg.encode(lifx.lan.header.make(stray.state), stray))
+    ...     device.sendto(stray, transport.get_extra_info("sockname"))
+    ...     await asyncio.sleep(0.2)
+    ...     transport.close()
+    ...     device.close()
+    ...     return [
+    ...         replies["first"] == [clients[0].source],
+    ...         replies["second"] == [clients[1].source] * 3,
+    ...         shared.unrouted,
+    ...     ]
+    >>> asyncio.run(main())
+    [True, True, 1]
+
+    Example, with one shared socket bound to the LIFX port::
+
+        import asyncio
+        import lifx
+
+        loop = asyncio.get_event_loop()
+        transport, shared = loop.run_until_complete(
+            loop.create_datagram_endpoint(
+                lifx.lan.client.shared.Shared, local_addr=("0.0.0.0", 56700)
+            )
+        )
+        dashboard = shared.attach(lifx.lan.client.asynchronous.Client([on_dashboard]))
+        automation = shared.attach(lifx.lan.client.asynchronous.Client([on_automation]))
+        loop.run_until_complete(dashboard.write([msg]))
+    """
+
+    def __init__(self):
+        self._transport = None
+        self._clients = {}  # type: Dict[int, Client]
+        self._source = random.randint(1, 0xFFFFFFFF)
+        self.unrouted = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def attach(self, client: Client) -> Client:
+        """
+        :param client: a client not connected to any transport
+        :return: the same client, with its own source and sending through the shared socket
+        """
+        while not self._source or self._source in self._clients:
+            self._source = (self._source + 1) & 0xFFFFFFFF
+        client.source = self._source
+        self._clients[client.source] = client
+        if self._transport:
+            client.connection_made(_Channel(self, client))
+        return client
+
+    def detach(self, client: Client):
+        if self._clients.pop(client.source, None) is client:
+            client.connection_lost(None)
+
+    def connection_made(self, transport: asyncio.DatagramTransport):
+        self._transport = transport
+        for client in self._clients.values():
+            client.connection_made(_Channel(self, client))
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self._transport = None
+        for client in self._clients.values():
+            client.connection_lost(exc)
+
+    def error_received(self, exc: Exception):
+        for client in self._clients.values():
+            client.error_received(exc)
+
+    def pause_writing(self):
+        for client in self._clients.values():
+            client.pause_writing()
+
+    def resume_writing(self):
+        for client in self._clients.values():
+            client.resume_writing()
+
+    def datagram_received(self, data: bytes, addr: Address):
+        client = self._clients.get(int.from_bytes(data[4:8], "little"))
+        if client:
+            client.datagram_received(data, addr)
+        else:
+            self.unrouted += 1
+
+
+class _Channel(asyncio.DatagramTransport):
+    """
+    The transport a client attached to a Shared socket writes to
+    """
+
+    def __init__(self, shared: Shared, client: Client):
+        super(_Channel, self).__init__()
+        self._shared = shared
+        self._client = client
+
+    def sendto(self, data: Any, addr: Address = None):
+        self._shared._transport.sendto(data, addr)
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        return self._shared._transport.get_extra_info(name, default)
+
+    def is_closing(self) -> bool:
+        return self._shared._transport is None or self._shared._transport.is_closing()
+
+    def close(self):
+        self._shared.detach(self._client)
+
+    def abort(self):
+        self.close()
+
+    def get_write_buffer_size(self) -> int:
+        return self._shared._transport.get_write_buffer_size()
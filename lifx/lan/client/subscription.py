@@ -0,0 +1,152 @@
+import asyncio
+
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, Tuple
+
+from lifx.lan import Msg
+from lifx.lan.scene import Tolerance
+
+
+Address = Tuple[str, int]
+
+DERIVED = ("rgb",)
+
+
+class Event(NamedTuple):
+    """
+    A device state change: previous is None the first time a device reports,
+    changed lists the fields that differ
+    """
+
+    address: Address
+    previous: Optional[Any]
+    current: Any
+    changed: Tuple[str, ...]
+
+
+class Subscription(object):
+    """
+    An asynchronous iterator of device state changes
+
+    Decoded State and StatePower replies are compared with the last state handed out
+    for the same device, color fields within tolerance count as unchanged.
+    Changes waiting to be consumed are coalesced per device, so a slow consumer
+    gets the latest state only; at most maxsize devices wait, the oldest
+    change is dropped (and counted in dropped) beyond that.
+    States come from the replies of the client the subscription is a task of.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> loop = asyncio.new_event_loop()
+    >>> subscription = lifx.lan.client.subscription.Subscription(loop=loop)
+    >>> body = lifx.lan.light.StatePower()
+    >>> def reply(level):
+    ...     body.level = level
+    ...     msg = lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body, "192.168.1.10", 56700)
+    ...     loop.run_until_complete(subscription(msg))
+    >>> reply(0); reply(0); reply(65535); reply(65535)
+    >>> async def consume(count):
+    ...     return [await subscription.__anext__() for _ in range(count)]
+    >>> [(event.previous, event.current, event.changed) for event in loop.run_until_complete(consume(1))]
+    [(None, PowerSnapshot(level=65535), ('level',))]
+    >>> len(subscription)
+    0
+    >>> small = lifx.lan.client.subscription.Subscription(maxsize=1, loop=loop)
+    >>> small.update(("192.168.1.10", 56700), body.to_snapshot())
+    >>> small.update(("192.168.1.11", 56700), body.to_snapshot())
+    >>> small.dropped
+    1
+    >>> loop.run_until_complete(small.__anext__()).address
+    ('192.168.1.11', 56700)
+    >>> small.update(("192.168.1.10", 56700), body.to_snapshot())
+    >>> len(small)
+    1
+    >>> loop.close()
+    """
+
+    def __init__(
+        self,
+        tolerance: Tolerance = Tolerance(),
+        maxsize: int = 1024,
+        loop: asyncio.AbstractEventLoop = None,
+    ):
+        """
+        :param tolerance: a lifx.lan.scene.Tolerance for hue, saturation, brightness and kelvin
+        :param maxsize: the maximum number of devices with a change waiting
+        :param loop: the event loop of the client
+        """
+        self._tolerance = tolerance
+        self._maxsize = maxsize
+        self._loop = loop or asyncio.get_event_loop()
+        self._known = {}
+        self._pending = OrderedDict()  # type: OrderedDict[Tuple, Event]
+        self._waiter = None  # type: Optional[asyncio.Future]
+        self._closed = False
+        self.dropped = 0
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        (header, body) = Msg.decode_bytes(bytes(msg))
+        if hasattr(body, "to_snapshot"):
+            self.update((msg.addr, msg.port), body.to_snapshot())
+
+    def update(self, address: Address, current: Any):
+        """
+        :param address: the device (addr, port)
+        :param current: a lifx.lan.light.StateSnapshot or lifx.lan.light.PowerSnapshot
+        """
+        key = (address, type(current))
+        pending = self._pending.get(key)
+        previous = pending.previous if pending else self._known.get(key)
+        changed = self.changed(previous, current)
+        if pending:
+            del self._pending[key]
+        if not changed:
+            self._known[key] = previous
+            return
+        self._known[key] = current
+        if not pending and len(self._pending) >= self._maxsize:
+            (dropped_key, dropped) = self._pending.popitem(last=False)
+            # the consumer never saw it: the next report is compared with what it saw
+            self._known[dropped_key] = dropped.previous
+            self.dropped += 1
+        self._pending[key] = Event(address, previous, current, changed)
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def changed(self, previous: Optional[Any], current: Any) -> Tuple[str, ...]:
+        if previous is None:
+            return tuple(name for name in current._fields if name not in DERIVED)
+        changed = []
+        for name, before, after in zip(current._fields, previous, current):
+            if name in DERIVED or before == after:
+                continue
+            if hasattr(self._tolerance, name):
+                difference = abs(after - before)
+                if name == "hue":
+                    difference = min(difference, 360 - difference)
+                if difference <= getattr(self._tolerance, name):
+                    continue
+            changed.append(name)
+        return tuple(changed)
+
+    def close(self):
+        """
+        End the iteration once the waiting changes are consumed
+        """
+        self._closed = True
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Event:
+        while not self._pending:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = self._loop.create_future()
+            await self._waiter
+        return self._pending.popitem(last=False)[1]
@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import os
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from lifx.lan import header as lan_header
+from lifx.lan import light, Msg
+from lifx.lan.client.replies import Replies
+
+
+Address = Tuple[str, int]
+
+
+class Result(NamedTuple):
+    """
+    Echo statistics of a device; rtt is the mean round trip time in seconds,
+    None when no echo came back
+
+    >>> import lifx
+    >>> result = lifx.lan.client.sweep.Result(sent=4, received=3, rtt=0.012)
+    >>> result.loss
+    0.25
+    """
+
+    sent: int
+    received: int
+    rtt: Optional[float]
+
+    @property
+    def loss(self) -> float:
+        return 1 - self.received / self.sent if self.sent else 0.0
+
+
+class Sweep(object):
+    """
+    A liveness check of the whole fleet with echo requests
+
+    Every request carries a unique payload, replies are matched by payload;
+    they reach the sweep through the tasks of the client it is run with.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> class Device(asyncio.DatagramProtocol):
+    ...     # echoes come back late and in reverse order
+    ...     def __init__(self):
+    ...         (self.held, self.most) = ([], 0)
+    ...     def connection_made(self, transport):
+    ...         self.transport = transport
+    ...     def datagram_received(self, data, addr):
+    ...         (_, request) = lifx.lan.Msg.decode_bytes(data)
+    ...         body = lifx.lan.light.EchoResponse()
+    ...         body.payload = request.payload
+    ...         self.held.append((bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body)), addr))
+    ...         self.most = max(self.most, len(self.held))
+    ...         if len(self.held) == 1:
+    ...             asyncio.get_running_loop().call_later(0.02, self.flush)
+    ...     def flush(self):
+    ...         for (data, addr) in reversed(self.held):
+    ...             self.transport.sendto(data, addr)
+    ...         self.held.clear()
+    >>> async def main():
+    ...     loop = asyncio.get_running_loop()
+    ...     (transport, device) = await loop.create_datagram_endpoint(Device, local_addr=("127.0.0.1", 0))
+    ...     address = transport.get_extra_info("sockname")
+    ...     sweep = lifx.lan.client.sweep.Sweep()
+    ...     (endpoint, client) = await loop.create_datagram_endpoint(
+    ...         lambda: lifx.lan.client.asynchronous.Client([sweep]), local_addr=("127.0.0.1", 0)
+    ...     )
+    ...     dead = ("127.0.0.1", 9)
+    ...     results = await sweep.run(client, [address, dead], count=4, window=2, timeout=0.2)
+    ...     endpoint.close()
+    ...     transport.close()
+    ...     return results[address], results[dead], device.most
+    >>> (alive, dead, most) = asyncio.run(main())
+    >>> alive.sent, alive.received, alive.loss, 0 < alive.rtt < 0.2
+    (4, 4, 0.0, True)
+    >>> dead
+    Result(sent=4, received=0, rtt=None)
+    >>> dead.loss
+    1.0
+
+    At most window requests wait for a reply:
+
+    >>> most
+    2
+
+    Example::
+
+        import asyncio
+        import lifx
+
+        sweep = lifx.lan.client.sweep.Sweep()
+        loop = asyncio.get_event_loop()
+        transport, client = loop.run_until_complete(
+            loop.create_datagram_endpoint(
+                lambda: lifx.lan.client.asynchronous.Client([sweep]),
+                local_addr=("0.0.0.0", 56700),
+            )
+        )
+        results = loop.run_until_complete(
+            sweep.run(client, [("192.168.1.10", 56700), ("192.168.1.11", 56700)])
+        )
+        for address, result in results.items():
+            print(address, result.rtt, result.loss)
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_event_loop()
+        self._prefix = os.urandom(8)
+        self._counter = itertools.count()
+        self._replies = Replies(self._loop)
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        received = self._loop.time()
+        (header, body) = Msg.decode_bytes(bytes(msg))
+        if header.field.type == lan_header.Header.State.echo_response:
+            self._replies.resolve(body.payload, received)
+
+    async def run(
+        self,
+        client: "lifx.lan.client.asynchronous.Client",
+        addresses: Iterable[Address],
+        count: int = 1,
+        window: int = 32,
+        timeout: float = 1,
+    ) -> Dict[Address, Result]:
+        """
+        :param client: a lifx.lan.client.asynchronous.Client having this sweep in its tasks
+        :param addresses: the devices (addr, port)
+        :param count: echo requests per device
+        :param window: the maximum number of requests waiting for a reply
+        :param timeout: seconds after which a request is considered lost
+        :return: a dict (addr, port) -> lifx.lan.client.sweep.Result
+        """
+        semaphore = asyncio.Semaphore(window)
+        addresses = list(addresses)
+        rtts = await asyncio.gather(
+            *(
+                self._ping(client, address, semaphore, timeout)
+                for address in addresses
+                for _ in range(count)
+            )
+        )
+        results = {}
+        for index, address in enumerate(addresses):
+            samples = [rtt for rtt in rtts[index * count : (index + 1) * count] if rtt]
+            results[address] = Result(
+                count, len(samples), sum(samples) / len(samples) if samples else None
+            )
+        return results
+
+    async def _ping(self, client, address, semaphore, timeout) -> Optional[float]:
+        body = light.EchoRequest()
+        body.payload = self._prefix + next(self._counter).to_bytes(8, "little")
+        header = lan_header.make(body.state)
+        header.field.ack_required = 0
+        sent = None
+
+        async def send():
+            nonlocal sent
+            sent = self._loop.time()
+            await client.write_many([address], header, body)
+
+        received = await self._replies.request(body.payload, send, timeout, semaphore)
+        return None if received is None else received - sent
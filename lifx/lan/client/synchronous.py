@@ -0,0 +1,240 @@
+import asyncio
+import threading
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from lifx.lan import Header, Msg
+from lifx.lan.client import asynchronous
+from lifx.lan.client.replies import Replies
+
+
+Address = Tuple[str, int]
+
+
+def reply_of(state: str) -> Optional[Header.State]:
+    """
+    >>> import lifx
+    >>> lifx.lan.client.synchronous.reply_of("get_power_light")
+    <State.state_power_light: 118>
+    >>> lifx.lan.client.synchronous.reply_of("echo_request")
+    <State.echo_response: 59>
+    >>> lifx.lan.client.synchronous.reply_of("set_color_light")
+    <State.acknowledgement: 45>
+
+    :param state: a request state string representation
+    :return: the lifx.lan.Header.State of the reply, None when unknown
+    """
+    if state.startswith("get_"):
+        return Header.State.__members__.get(state.replace("get_", "state_", 1))
+    if state == "echo_request":
+        return Header.State.echo_response
+    return Header.State.acknowledgement
+
+
+class Client(object):
+    """
+    A blocking client for code without an event loop
+
+    The client owns a background thread running an event loop and a single
+    lifx.lan.client.asynchronous.Client socket, reused by every call; calls
+    are safe from any number of threads. Every request is stamped with its
+    own sequence number and takes only the reply carrying it back.
+
+    >>> import socket
+    >>> import threading
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> import lifx
+    >>> device = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    >>> device.bind(("127.0.0.1", 0))
+    >>> address = device.getsockname()
+    >>> def reply(request, addr, body):
+    ...     header = lifx.lan.header.make(body.state)
+    ...     header.field.sequence = request.field.sequence
+    ...     device.sendto(bytes(lifx.lan.Msg.encode(header, body)), addr)
+    >>> def serve():
+    ...     # echo requests are answered two at a time, the latest first
+    ...     (power, echoes) = (lifx.lan.light.StatePower(), [])
+    ...     while True:
+    ...         (data, addr) = device.recvfrom(1024)
+    ...         (request, body) = lifx.lan.Msg.decode_bytes(data)
+    ...         if request.type.name == "set_power_light":
+    ...             power.level = body.level
+    ...         elif request.type.name == "get_power_light":
+    ...             reply(request, addr, power)
+    ...         elif request.type.name == "echo_request":
+    ...             echo = lifx.lan.light.EchoResponse()
+    ...             echo.payload = body.payload
+    ...             echoes.append((request, addr, echo))
+    ...             if len(echoes) == 2:
+    ...                 for held in reversed(echoes):
+    ...                     reply(*held)
+    ...                 echoes.clear()
+    >>> threading.Thread(target=serve, daemon=True).start()
+    >>> client = lifx.lan.client.synchronous.Client(("127.0.0.1", 0), timeout=0.5)
+    >>> body = lifx.lan.light.SetPower()
+    >>> body.level = body.ON
+    >>> client.send(lifx.lan.header.make(body.state), body, [address])
+    >>> body = lifx.lan.light.GetPower()
+    >>> client.request(lifx.lan.header.make(body.state), body, address).level
+    65535
+    >>> unreachable = ("127.0.0.1", 9)
+    >>> states = client.request_many(lifx.lan.header.make(body.state), body, [address, unreachable], timeout=0.2)
+    >>> states[address].level, states[unreachable]
+    (65535, None)
+    >>> def echo(payload):
+    ...     body = lifx.lan.light.EchoRequest()
+    ...     body.payload = payload
+    ...     return client.request(lifx.lan.header.make(body.state), body, address).payload[:6]
+    >>> with ThreadPoolExecutor(2) as threads:
+    ...     list(threads.map(echo, [b"first", b"second"]))
+    [b'first\\x00', b'second']
+    >>> client.close()
+    >>> device.close()
+
+    Example::
+
+        import lifx
+
+        with lifx.lan.client.synchronous.Client(retries=2) as client:
+            body = lifx.lan.light.Get()
+            header = lifx.lan.header.make(body.state)
+            state = client.request(header, body, ("192.168.1.10", 56700))
+            states = client.request_many(header, body, addresses, timeout=0.5)
+
+            body = lifx.lan.light.SetPower()
+            body.level = body.ON
+            client.send(lifx.lan.header.make(body.state), body, addresses)
+    """
+
+    def __init__(
+        self, local_addr: Address = ("0.0.0.0", 0), timeout: float = 1, **options
+    ):
+        """
+        :param local_addr: the (addr, port) to bind the socket to
+        :param timeout: default seconds to wait for a reply
+        :param options: lifx.lan.client.asynchronous.Client keyword arguments
+            (metrics, retries, rates, ...)
+        """
+        self._timeout = timeout
+        self._sequence = 0
+        self._loop = asyncio.new_event_loop()
+        # replies are told by (addr, port, sequence, reply type)
+        self._replies = Replies(self._loop)
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="lifx-client", daemon=True
+        )
+        self._thread.start()
+        try:
+            (self._transport, self.client) = self._call(
+                self._loop.create_datagram_endpoint(
+                    lambda: asynchronous.Client([self._received], **options),
+                    local_addr=local_addr,
+                )
+            )
+        except Exception:
+            self._stop()
+            raise
+
+    def send(self, header: "lifx.lan.Header", body: Any, addresses: Iterable[Address]):
+        """
+        Send a message to every address, without waiting for replies
+
+        :param header: a lifx.lan.Header
+        :param body: a lifx lan payload
+        :param addresses: a list of (addr, port)
+        """
+        self._call(self._send(header, body, list(addresses)))
+
+    def request(
+        self,
+        header: "lifx.lan.Header",
+        body: Any,
+        address: Address,
+        timeout: float = None,
+    ) -> Optional[Any]:
+        """
+        :param header: a lifx.lan.Header, a get request or one requiring an acknowledgement
+        :param body: a lifx lan payload
+        :param address: the device (addr, port)
+        :param timeout: seconds to wait for the reply, the client default when None
+        :return: the decoded reply body, None when no reply came in time
+        """
+        return self.request_many(header, body, [address], timeout)[address]
+
+    def request_many(
+        self,
+        header: "lifx.lan.Header",
+        body: Any,
+        addresses: Iterable[Address],
+        timeout: float = None,
+    ) -> Dict[Address, Optional[Any]]:
+        """
+        Send the same request to many devices and wait for all of their replies
+
+        :param header: a lifx.lan.Header
+        :param body: a lifx lan payload
+        :param addresses: a list of (addr, port)
+        :param timeout: seconds to wait for the replies, the client default when None
+        :return: a dict (addr, port) -> decoded reply body, None when no reply came in time
+        """
+        reply = reply_of(body.state)
+        if reply is None:
+            raise ValueError("no known reply to {}".format(body.state))
+        addresses = list(addresses)
+        timeout = self._timeout if timeout is None else timeout
+        bodies = self._call(self._request(header, body, addresses, reply, timeout))
+        return dict(zip(addresses, bodies))
+
+    def close(self):
+        """
+        Close the socket and stop the background thread
+        """
+        if self._thread.is_alive():
+            self._call(self._close())
+            self._stop()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _close(self):
+        self._transport.close()
+        # let connection_lost run before the loop stops
+        await asyncio.sleep(0)
+
+    async def _received(self, msg: "lifx.lan.Msg"):
+        (header, body) = Msg.decode_bytes(bytes(msg))
+        self._replies.resolve(
+            (msg.addr, msg.port, header.field.sequence, header.field.type), body
+        )
+
+    async def _send(self, header, body, addresses) -> int:
+        # stamped here rather than by the asynchronous client to be known in advance,
+        # the asynchronous client keeps a sequence number already stamped
+        self._sequence = self._sequence % 255 + 1
+        header = Header.from_buffer_copy(header)
+        header.field.sequence = self._sequence
+        await self.client.write_many(addresses, header, body)
+        return self._sequence
+
+    async def _request(self, header, body, addresses, reply, timeout):
+        sequence = await self._send(header, body, addresses)
+        keys = [(addr, port, sequence, reply) for (addr, port) in addresses]
+        # the sequence wraps at 256: a request still waiting with it is given up
+        futures = [self._replies.expect(key) for key in keys]
+        return await asyncio.gather(
+            *(
+                self._replies.wait(key, future, timeout)
+                for (key, future) in zip(keys, futures)
+            )
+        )
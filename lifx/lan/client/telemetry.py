@@ -0,0 +1,214 @@
+import asyncio
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from lifx.lan import header as lan_header
+from lifx.lan import light, Msg
+from lifx.lan.client.replies import Replies
+
+
+Address = Tuple[str, int]
+
+QUERIES = (
+    light.GetWifiInfo,
+    light.GetHostInfo,
+    light.GetWifiFirmware,
+    light.GetHostFirmware,
+    light.GetVersion,
+    light.GetInfo,
+)
+
+
+class Telemetry(NamedTuple):
+    """
+    What a device told about itself, None where it did not answer;
+    rssi is in dBm, uptime and downtime in seconds
+    """
+
+    rssi: Optional[int] = None
+    wifi_tx: Optional[int] = None
+    wifi_rx: Optional[int] = None
+    host_tx: Optional[int] = None
+    host_rx: Optional[int] = None
+    wifi_firmware: Optional[str] = None
+    host_firmware: Optional[str] = None
+    vendor: Optional[int] = None
+    product: Optional[int] = None
+    version: Optional[int] = None
+    uptime: Optional[float] = None
+    downtime: Optional[float] = None
+
+    @classmethod
+    def from_bodies(cls, bodies: Dict[str, object]) -> "Telemetry":
+        """
+        >>> import lifx
+        >>> wifi = lifx.lan.light.StateWifiInfo()
+        >>> wifi.field.signal = 1e-7
+        >>> version = lifx.lan.light.StateVersion()
+        >>> version.field.product = 27
+        >>> telemetry = lifx.lan.client.telemetry.Telemetry.from_bodies(
+        ...     {wifi.state: wifi, version.state: version})
+        >>> telemetry.rssi, telemetry.product, telemetry.uptime
+        (-70, 27, None)
+
+        :param bodies: a dict body state -> decoded body
+        """
+        values = {}
+        wifi = bodies.get("state_wifi_info")
+        if wifi:
+            values.update(rssi=wifi.rssi, wifi_tx=wifi.tx, wifi_rx=wifi.rx)
+        host = bodies.get("state_host_info")
+        if host:
+            values.update(host_tx=host.tx, host_rx=host.rx)
+        if "state_wifi_firmware" in bodies:
+            values.update(wifi_firmware=bodies["state_wifi_firmware"].version)
+        if "state_host_firmware" in bodies:
+            values.update(host_firmware=bodies["state_host_firmware"].version)
+        version = bodies.get("state_version")
+        if version:
+            values.update(
+                vendor=version.vendor, product=version.product, version=version.version
+            )
+        info = bodies.get("state_info")
+        if info:
+            values.update(uptime=info.uptime, downtime=info.downtime)
+        return cls(**values)
+
+
+class Collector(object):
+    """
+    Wi-Fi signal, traffic counters, firmware versions and uptime of the whole fleet
+
+    Devices are queried concurrently, at most window queries wait for a reply
+    and no more than rate queries per second are sent. The client sending
+    the queries hands the replies to the collector, which is one of its tasks.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> class Device(asyncio.DatagramProtocol):
+    ...     # answers every query 50ms late, remembering when queries came
+    ...     def __init__(self):
+    ...         (self.held, self.most, self.times) = ([], 0, [])
+    ...     def connection_made(self, transport):
+    ...         self.transport = transport
+    ...     def datagram_received(self, data, addr):
+    ...         loop = asyncio.get_running_loop()
+    ...         self.times.append(loop.time())
+    ...         (request, _) = lifx.lan.Msg.decode_bytes(data)
+    ...         state = lifx.lan.Header.State[request.type.name.replace("get_", "state_", 1)]
+    ...         body = lifx.lan.msg.BODIES[state]()
+    ...         if state == lifx.lan.Header.State.state_version:
+    ...             body.field.product = 27
+    ...         self.held.append((bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body)), addr))
+    ...         self.most = max(self.most, len(self.held))
+    ...         loop.call_later(0.05, self.reply)
+    ...     def reply(self):
+    ...         self.transport.sendto(*self.held.pop(0))
+    >>> async def main(rate, window):
+    ...     loop = asyncio.get_running_loop()
+    ...     (transport, device) = await loop.create_datagram_endpoint(Device, local_addr=("127.0.0.1", 0))
+    ...     address = transport.get_extra_info("sockname")
+    ...     collector = lifx.lan.client.telemetry.Collector()
+    ...     (endpoint, client) = await loop.create_datagram_endpoint(
+    ...         lambda: lifx.lan.client.asynchronous.Client([collector]), local_addr=("127.0.0.1", 0)
+    ...     )
+    ...     dead = ("127.0.0.1", 9)
+    ...     table = await collector.run(client, [address, dead], rate, window, timeout=0.2)
+    ...     endpoint.close()
+    ...     transport.close()
+    ...     return table[address], table[dead], device
+    >>> (alive, dead, device) = asyncio.run(main(rate=1000, window=2))
+    >>> alive.product, alive.host_firmware, alive.uptime
+    (27, '0.0', 0.0)
+    >>> dead == lifx.lan.client.telemetry.Telemetry()
+    True
+
+    Every query got its reply and at most window of them waited at once:
+
+    >>> len(device.times), device.most
+    (6, 2)
+
+    Queries are sent no faster than rate per second, 6 of them at 50 per second
+    take at least 100ms:
+
+    >>> (_, _, device) = asyncio.run(main(rate=50, window=32))
+    >>> device.times[-1] - device.times[0] > 0.09
+    True
+
+    Example::
+
+        import asyncio
+        import lifx
+
+        collector = lifx.lan.client.telemetry.Collector()
+        loop = asyncio.get_event_loop()
+        transport, client = loop.run_until_complete(
+            loop.create_datagram_endpoint(
+                lambda: lifx.lan.client.asynchronous.Client([collector]),
+                local_addr=("0.0.0.0", 56700),
+            )
+        )
+        table = loop.run_until_complete(collector.run(client, addresses))
+        for address, telemetry in sorted(table.items(), key=lambda item: item[1].rssi or 0):
+            print(address, telemetry.rssi, telemetry.uptime, telemetry.host_firmware)
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_event_loop()
+        self._replies = Replies(self._loop)
+        self._next_at = 0.0
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        (header, body) = Msg.decode_bytes(bytes(msg))
+        self._replies.resolve((msg.addr, header.field.type), body)
+
+    async def run(
+        self,
+        client: "lifx.lan.client.asynchronous.Client",
+        addresses: Iterable[Address],
+        rate: float = 20,
+        window: int = 32,
+        timeout: float = 1,
+    ) -> Dict[Address, Telemetry]:
+        """
+        :param client: a lifx.lan.client.asynchronous.Client having this collector in its tasks
+        :param addresses: the devices (addr, port)
+        :param rate: the maximum number of queries per second
+        :param window: the maximum number of queries waiting for a reply
+        :param timeout: seconds after which a query is considered lost
+        :return: a dict (addr, port) -> lifx.lan.client.telemetry.Telemetry
+        """
+        semaphore = asyncio.Semaphore(window)
+        addresses = list(addresses)
+        bodies = await asyncio.gather(
+            *(
+                self._query(client, address, query, rate, semaphore, timeout)
+                for address in addresses
+                for query in QUERIES
+            )
+        )
+        results = {}
+        for index, address in enumerate(addresses):
+            replies = bodies[index * len(QUERIES) : (index + 1) * len(QUERIES)]
+            results[address] = Telemetry.from_bodies(
+                {body.state: body for body in replies if body is not None}
+            )
+        return results
+
+    async def _query(self, client, address, query, rate, semaphore, timeout):
+        body = query()
+        header = lan_header.make(body.state)
+        header.field.ack_required = 0
+        reply = lan_header.Header.State[body.state.replace("get_", "state_", 1)]
+
+        async def send():
+            now = self._loop.time()
+            slot = max(now, self._next_at)
+            self._next_at = slot + 1 / rate
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            await client.write_many([address], header, body)
+
+        return await self._replies.request(
+            (address[0], reply), send, timeout, semaphore
+        )
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from lifx.lan import header as lan_header
+from lifx.lan import light
+from lifx.lan.client.asynchronous import Client
+
+
+Address = Tuple[str, int]
+
+
+class Interface(NamedTuple):
+    """
+    A local endpoint and the broadcast address of its network, for example
+    Interface(("10.0.1.5", 0), ("10.0.1.255", 56700))
+    """
+
+    local: Address
+    broadcast: Address
+
+
+class _Route(object):
+    """
+    A client task remembering that replies from a device came through an interface
+    """
+
+    def __init__(self, controller: "Controller", interface: Interface):
+        self._controller = controller
+        self._interface = interface
+        self.client = None  # type: Client
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        address = (msg.addr, msg.port)
+        if self._controller.devices.get(address) != self._interface:
+            self._controller.devices[address] = self._interface
+            self._controller._routes[address] = self.client
+
+
+class Controller(object):
+    """
+    One client per network interface, for devices spread over several
+    subnets or VLANs
+
+    Every reply tells which interface reaches its device, outgoing messages
+    then leave through that interface socket: routing costs a dict lookup.
+
+    >>> import asyncio
+    >>> import lifx
+    >>> class Device(asyncio.DatagramProtocol):
+    ...     def __init__(self):
+    ...         self.senders = []
+    ...     def connection_made(self, transport):
+    ...         self.transport = transport
+    ...     def datagram_received(self, data, addr):
+    ...         (header, _) = lifx.lan.Msg.decode_bytes(data)
+    ...         self.senders.append((header.type.name, addr))
+    ...         if header.type == lifx.lan.Header.State.get_service:
+    ...             body = lifx.lan.light.StateService()
+    ...             reply = lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body)
+    ...             self.transport.sendto(bytes(reply), addr)
+    >>> async def main():
+    ...     loop = asyncio.get_running_loop()
+    ...     devices = []
+    ...     for _ in range(2):
+    ...         (transport, device) = await loop.create_datagram_endpoint(Device, local_addr=("127.0.0.1", 0))
+    ...         devices.append((transport.get_extra_info("sockname"), device))
+    ...     # on loopback each device address stands for the broadcast address of its own network
+    ...     controller = lifx.lan.controller.Controller(
+    ...         [lifx.lan.controller.Interface(("127.0.0.1", 0), address) for (address, _) in devices]
+    ...     )
+    ...     await controller.start()
+    ...     found = await controller.discover(timeout=0.2)
+    ...     body = lifx.lan.light.SetPower()
+    ...     await controller.write_many(list(found) + [("127.0.0.1", 9)], lifx.lan.header.make(body.state), body)
+    ...     await asyncio.sleep(0.1)
+    ...     controller.close()
+    ...     return found, devices
+    >>> (found, devices) = asyncio.run(main())
+    >>> [found[address].broadcast == address for (address, _) in devices]
+    [True, True]
+    >>> [[name for (name, _) in device.senders] for (_, device) in devices]
+    [['get_service', 'set_power_light'], ['get_service', 'set_power_light']]
+
+    Each device is reached by a single socket, and not the same one:
+
+    >>> [len({sender for (_, sender) in device.senders}) for (_, device) in devices]
+    [1, 1]
+    >>> devices[0][1].senders[0][1] != devices[1][1].senders[0][1]
+    True
+
+    Example::
+
+        import asyncio
+        import lifx
+
+        controller = lifx.lan.controller.Controller(
+            [
+                lifx.lan.controller.Interface(("10.0.1.5", 0), ("10.0.1.255", 56700)),
+                lifx.lan.controller.Interface(("10.0.2.5", 0), ("10.0.2.255", 56700)),
+            ],
+            tasks=[process_responses],
+            retries=2,
+        )
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(controller.start())
+        devices = loop.run_until_complete(controller.discover())
+
+        body = lifx.lan.light.SetPower()
+        body.level = body.ON
+        loop.run_until_complete(
+            controller.write_many(devices, lifx.lan.header.make(body.state), body)
+        )
+    """
+
+    def __init__(
+        self, interfaces: Iterable[Interface], tasks: Iterable[Any] = (), **options
+    ):
+        """
+        :param interfaces: a list of lifx.lan.controller.Interface
+        :param tasks: coroutine functions called with every lifx.lan.Msg received on any interface
+        :param options: lifx.lan.client.asynchronous.Client keyword arguments
+            (metrics, retries, rates, ...) used for every interface
+        """
+        self.interfaces = list(interfaces)
+        self.clients = {}  # type: Dict[Interface, Client]
+        self.devices = {}  # type: Dict[Address, Interface]
+        self._routes = {}  # type: Dict[Address, Client]
+        self._tasks = list(tasks)
+        self._options = options
+        self._transports = []
+
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self):
+        """
+        Bind one socket per interface
+        """
+        loop = asyncio.get_event_loop()
+        for interface in self.interfaces:
+            route = _Route(self, interface)
+            (transport, client) = await loop.create_datagram_endpoint(
+                lambda: Client(self._tasks + [route], **self._options),
+                local_addr=interface.local,
+                allow_broadcast=True,
+            )
+            route.client = client
+            self.clients[interface] = client
+            self._transports.append(transport)
+
+    async def discover(self, timeout: float = 1) -> Dict[Address, Interface]:
+        """
+        Broadcast a service request on every interface at once and collect the replies
+
+        :param timeout: seconds to wait for the replies
+        :return: a dict device (addr, port) -> lifx.lan.controller.Interface reaching it
+        """
+        body = light.GetService()
+        header = lan_header.make(body.state)
+        header.field.ack_required = 0
+        await asyncio.gather(
+            *(
+                client.write_many([interface.broadcast], header, body)
+                for interface, client in self.clients.items()
+            )
+        )
+        await asyncio.sleep(timeout)
+        return dict(self.devices)
+
+    def client_of(self, address: Address) -> Client:
+        """
+        :param address: a device (addr, port)
+        :return: the lifx.lan.client.asynchronous.Client reaching the device
+        :raise KeyError: when the device has not been heard on any interface
+        """
+        return self._routes[address]
+
+    async def write_many(
+        self, addresses: Iterable[Address], header: "lifx.lan.Header", body: Any
+    ):
+        """
+        Send the same message to many devices, each through the interface reaching it;
+        devices never heard are skipped
+
+        :param addresses: a list of (addr, port)
+        :param header: a lifx.lan.Header
+        :param body: a lifx lan payload
+        """
+        routes = self._routes
+        batches = {}  # type: Dict[Client, List[Address]]
+        for address in addresses:
+            client = routes.get(address)
+            if client is None:
+                self.logger.warning("no route to {}".format(address[0]))
+                continue
+            batches.setdefault(client, []).append(address)
+        for client, batch in batches.items():
+            await client.write_many(batch, header, body)
+
+    def close(self):
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+        self.clients.clear()
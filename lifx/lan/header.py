@@ -1,6 +1,7 @@
-import logging
 from ctypes import c_uint8, c_uint32, c_uint16, c_uint64, LittleEndianStructure, Union
 from enum import IntEnum
+from struct import Struct
+from typing import Optional
 
 
 class _Header(LittleEndianStructure):
@@ -48,46 +49,46 @@ class Header(Union):
     _fields_ = [("bytes", c_uint8 * 36), ("field", _Header)]
 
     class State(IntEnum):
-        get_service = (2,)
-        state_service = (3,)
-        get_host_info = (12,)
-        state_host_info = (13,)
-        get_host_firmware = (14,)
-        state_host_firmware = (15,)
-        get_wifi_info = (16,)
-        state_wifi_info = (17,)
-        get_wifi_firmware = (18,)
-        state_wifi_firmware = (19,)
-        get_power = (20,)
-        set_power = (21,)
-        state_power = (22,)
-        get_label = (23,)
-        set_label = (24,)
-        state_label = (25,)
-        get_version = (32,)
-        state_version = (33,)
-        get_info = (34,)
-        state_info = (35,)
-        acknowledgement = (45,)
-        get_location = (48,)
-        state_location = (50,)
-        get_group = (51,)
-        state_group = (53,)
-        echo_request = (58,)
-        echo_response = (59,)
-        get_light = (101,)
-        set_color_light = (102,)
-        set_waveform_light = (103,)
-        state_light = (107,)
-        get_power_light = (116,)
-        set_power_light = (117,)
-        state_power_light = (118,)
-        get_infrared = (120,)
-        state_infrared = (121,)
-        set_infrared = (122,)
-        set_color_zone = (501,)
-        get_color_zone = (502,)
-        state_zone = (503,)
+        get_service = 2
+        state_service = 3
+        get_host_info = 12
+        state_host_info = 13
+        get_host_firmware = 14
+        state_host_firmware = 15
+        get_wifi_info = 16
+        state_wifi_info = 17
+        get_wifi_firmware = 18
+        state_wifi_firmware = 19
+        get_power = 20
+        set_power = 21
+        state_power = 22
+        get_label = 23
+        set_label = 24
+        state_label = 25
+        get_version = 32
+        state_version = 33
+        get_info = 34
+        state_info = 35
+        acknowledgement = 45
+        get_location = 48
+        state_location = 50
+        get_group = 51
+        state_group = 53
+        echo_request = 58
+        echo_response = 59
+        get_light = 101
+        set_color_light = 102
+        set_waveform_light = 103
+        state_light = 107
+        get_power_light = 116
+        set_power_light = 117
+        state_power_light = 118
+        get_infrared = 120
+        state_infrared = 121
+        set_infrared = 122
+        set_color_zone = 501
+        get_color_zone = 502
+        state_zone = 503
         state_multi_zone = 506
 
     @property
@@ -100,6 +101,8 @@ class Header(Union):
         try:
             state = self.State(self.field.type)
         except ValueError as e:
+            import logging
+
             logging.error(e)
             state = str(self.field.type)
         return state
@@ -130,3 +133,48 @@ def make(state: str) -> "lifx.lan.Header":
     header.field.addressable = 1
     header.field.ack_required = 1
     return header
+
+
+PROTOCOL = 1024
+
+_FRAME = Struct("<HH")
+
+
+class Reject(IntEnum):
+    """
+    Why a datagram is not a lifx message
+    """
+
+    short = 1  # not even a whole header
+    size = 2  # the size field does not match the datagram length
+    protocol = 3  # the protocol field is not 1024
+
+
+def validate(data: bytes) -> Optional[Reject]:
+    """
+    Check a received datagram from its raw bytes, before building any message
+
+    >>> import lifx
+    >>> data = bytes(lifx.lan.Msg.encode(lifx.lan.header.make("get_power"), lifx.lan.light.GetPower(), "192.168.1.10", 56700))
+    >>> lifx.lan.header.validate(data) is None
+    True
+    >>> lifx.lan.header.validate(data[:20])
+    <Reject.short: 1>
+    >>> lifx.lan.header.validate(data + bytes(4))
+    <Reject.size: 2>
+    >>> lifx.lan.header.validate(b"M-SEARCH * HTTP/1.1\\r\\nHOST: 239.255.255.250:1900")
+    <Reject.size: 2>
+    >>> lifx.lan.header.validate(bytes([36, 0, 0, 0x30]) + bytes(32))
+    <Reject.protocol: 3>
+
+    :param data: a datagram
+    :return: None for a well formed lifx message, a lifx.lan.header.Reject reason otherwise
+    """
+    if len(data) < 36:
+        return Reject.short
+    (size, flags) = _FRAME.unpack_from(data)
+    if size != len(data):
+        return Reject.size
+    if flags & 0x0FFF != PROTOCOL:
+        return Reject.protocol
+    return None
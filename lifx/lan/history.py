@@ -0,0 +1,237 @@
+import time
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from lifx.lan.light import State, StatePower
+
+
+# timestamps are stored as unsigned 32 bit ticks from the history epoch:
+# a tenth of a second keeps 13 years in range
+RESOLUTION = 0.1
+
+
+class Samples(NamedTuple):
+    """
+    States in chronological order, column by column: hue, saturation, brightness
+    and kelvin hold raw protocol values (0..65535 and kelvin degrees), as power does
+    """
+
+    time: List[float]
+    hue: array
+    saturation: array
+    brightness: array
+    kelvin: array
+    power: array
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+class Ring(object):
+    """
+    The last capacity states of a device in three flat arrays
+    (ticks, packed HSBK and power): 14 bytes per state, allocated up front.
+    Appending over a full ring overwrites the oldest state.
+    """
+
+    __slots__ = ("capacity", "_ticks", "_colors", "_power", "_next", "_count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ticks = array("I", bytes(4 * capacity))
+        self._colors = array("H", bytes(8 * capacity))
+        self._power = array("H", bytes(2 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, tick: int, color: Iterable[int], power: int):
+        """
+        :param tick: the state time in ticks, clamped to the last one when older
+        :param color: the raw (hue, saturation, brightness, kelvin)
+        :param power: the raw power level
+        """
+        if self._count and tick < self._ticks[self._next - 1]:
+            tick = self._ticks[self._next - 1]
+        index = self._next
+        self._ticks[index] = tick
+        self._colors[4 * index : 4 * index + 4] = array("H", color)
+        self._power[index] = power
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def last(self) -> Optional[array]:
+        """
+        :return: the raw (hue, saturation, brightness, kelvin) of the newest state, None when empty
+        """
+        if not self._count:
+            return None
+        index = (self._next - 1) % self.capacity
+        return self._colors[4 * index : 4 * index + 4]
+
+    def ordered(self):
+        """
+        :return: copies of the ticks, colors and power arrays, oldest state first
+        """
+        if self._count < self.capacity:
+            count = self._count
+            return self._ticks[:count], self._colors[: 4 * count], self._power[:count]
+        split = self._next
+        return (
+            self._ticks[split:] + self._ticks[:split],
+            self._colors[4 * split :] + self._colors[: 4 * split],
+            self._power[split:] + self._power[:split],
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class History(object):
+    """
+    The recent states of every device, fed from decoded State and StatePower
+    replies and keyed by device target (MAC address as 16 hex digits).
+    Each device gets a fixed size lifx.lan.history.Ring: a 2000 device fleet
+    keeping 256 states each fits in under 9MB.
+    Add the history to the tasks of lifx.lan.client.asynchronous.Client
+    and poll the devices state: every reply is recorded.
+
+    >>> import lifx
+    >>> history = lifx.lan.history.History(capacity=4, epoch=1000)
+    >>> body = lifx.lan.light.State()
+    >>> body.power = 65535
+    >>> body.field.color.kelvin = 3500
+    >>> for second in range(6):
+    ...     body.field.color.brightness = second * 1000
+    ...     history.update("d073d5121af10000", body, now=1000 + second)
+    >>> samples = history.range("d073d5121af10000")
+    >>> samples.time
+    [1002.0, 1003.0, 1004.0, 1005.0]
+    >>> samples.brightness.tolist()
+    [2000, 3000, 4000, 5000]
+    >>> power = lifx.lan.light.StatePower()
+    >>> history.update("d073d5121af10000", power, now=1006)
+    >>> samples = history.range("d073d5121af10000", start=1005.5)
+    >>> samples.brightness.tolist(), samples.power.tolist()
+    ([5000], [0])
+    >>> samples = history.downsample("d073d5121af10000", start=1003, end=1007, step=2)
+    >>> samples.time, samples.brightness.tolist(), samples.power.tolist()
+    ([1005.0, 1007.0], [5000, 5000], [65535, 0])
+    >>> len(history.range("unknown"))
+    0
+
+    A StatePower keeps the last color, also right after the ring wraps:
+
+    >>> history = lifx.lan.history.History(capacity=4, epoch=1000)
+    >>> for second in range(4):
+    ...     body.field.color.brightness = second * 1000
+    ...     history.update("d073d5121af10000", body, now=1000 + second)
+    >>> history.update("d073d5121af10000", power, now=1004)
+    >>> samples = history.range("d073d5121af10000", start=1004)
+    >>> samples.brightness.tolist(), samples.kelvin.tolist(), samples.power.tolist()
+    ([3000], [3500], [0])
+    """
+
+    def __init__(self, capacity: int = 256, epoch: float = None):
+        """
+        :param capacity: the number of states kept per device
+        :param epoch: the earliest time to store, time.time() when None
+        """
+        self.capacity = capacity
+        self.epoch = time.time() if epoch is None else epoch
+        self._rings = {}  # type: Dict[str, Ring]
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        (header, body) = msg.decode()
+        self.update(bytes(header.field.target).hex(), body)
+
+    def update(self, target: str, body, now: float = None):
+        """
+        :param target: the device target (MAC address as 16 hex digits)
+        :param body: a lifx.lan.light.State or lifx.lan.light.StatePower, others are ignored
+        :param now: the reply timestamp, time.time() when None
+        """
+        if isinstance(body, State):
+            color = body.field.color
+            (color, power) = (
+                (color.hue, color.saturation, color.brightness, color.kelvin),
+                body.field.power,
+            )
+        elif isinstance(body, StatePower):
+            (color, power) = (None, body.field.level)
+        else:
+            return
+        ring = self._rings.get(target)
+        if ring is None:
+            ring = self._rings[target] = Ring(self.capacity)
+        if color is None:
+            color = ring.last() or (0, 0, 0, 0)
+        ring.append(self._tick(time.time() if now is None else now), color, power)
+
+    def range(self, target: str, start: float = None, end: float = None) -> Samples:
+        """
+        :param target: the device target
+        :param start: the earliest state time, the oldest kept when None
+        :param end: the latest state time, the newest when None
+        :return: a lifx.lan.history.Samples of the states in [start, end]
+        """
+        (ticks, colors, power) = self._ordered(target)
+        first = 0 if start is None else bisect_left(ticks, self._tick(start))
+        last = len(ticks) if end is None else bisect_right(ticks, self._tick(end))
+        return self._samples(
+            ticks[first:last], colors[4 * first : 4 * last], power[first:last]
+        )
+
+    def downsample(self, target: str, start: float, end: float, step: float) -> Samples:
+        """
+        The device state as of the end of every step long interval from start to end,
+        intervals before the first known state are left out
+
+        :param target: the device target
+        :param start: the beginning of the first interval
+        :param end: the end of the last interval
+        :param step: the interval length in seconds
+        :return: a lifx.lan.history.Samples, timed at the end of each interval
+        """
+        (ticks, colors, power) = self._ordered(target)
+        picked = array("I")
+        indexes = []
+        count = round((end - start) / step)
+        for interval in range(1, count + 1):
+            tick = self._tick(start + interval * step)
+            index = bisect_right(ticks, tick) - 1
+            if index >= 0:
+                picked.append(tick)
+                indexes.append(index)
+        return self._samples(
+            picked,
+            array("H", [colors[4 * i + c] for i in indexes for c in range(4)]),
+            array("H", [power[i] for i in indexes]),
+        )
+
+    def targets(self) -> List[str]:
+        return list(self._rings)
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def _tick(self, timestamp: float) -> int:
+        return max(0, round((timestamp - self.epoch) / RESOLUTION))
+
+    def _ordered(self, target: str):
+        ring = self._rings.get(target)
+        if ring is None:
+            return array("I"), array("H"), array("H")
+        return ring.ordered()
+
+    def _samples(self, ticks: array, colors: array, power: array) -> Samples:
+        epoch = self.epoch
+        return Samples(
+            [round(epoch + tick * RESOLUTION, 1) for tick in ticks],
+            colors[0::4],
+            colors[1::4],
+            colors[2::4],
+            colors[3::4],
+            power,
+        )
@@ -0,0 +1,117 @@
+from typing import Dict, FrozenSet, Tuple
+
+from lifx.lan import light
+
+
+Address = Tuple[str, int]
+
+
+class Index(object):
+    """
+    Devices by group and by location, refreshed from StateGroup and StateLocation
+    replies. An Index is a client task: pass it to lifx.lan.client.asynchronous.Client
+    and ask every device for its group and location (get_group, get_location)
+    to keep it up to date.
+
+    >>> import lifx
+    >>> index = lifx.lan.index.Index()
+    >>> body = lifx.lan.light.StateGroup()
+    >>> body.group = "00112233445566778899aabbccddeeff"
+    >>> body.label = "Kitchen"
+    >>> index.update(("192.168.1.10", 56700), body)
+    >>> index.update(("192.168.1.11", 56700), body)
+    >>> sorted(index.group("00112233445566778899aabbccddeeff"))
+    [('192.168.1.10', 56700), ('192.168.1.11', 56700)]
+    >>> index.groups()
+    {'00112233445566778899aabbccddeeff': 'Kitchen'}
+    >>> body.group = "ffeeddccbbaa99887766554433221100"
+    >>> body.label = "Bedroom"
+    >>> index.update(("192.168.1.11", 56700), body)
+    >>> sorted(index.group("00112233445566778899aabbccddeeff"))
+    [('192.168.1.10', 56700)]
+    >>> index.group_of(("192.168.1.11", 56700))
+    'ffeeddccbbaa99887766554433221100'
+    >>> index.group("unknown")
+    frozenset()
+    """
+
+    def __init__(self):
+        self._groups = _Membership()
+        self._locations = _Membership()
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        (header, body) = msg.decode()
+        self.update((msg.addr, msg.port), body)
+
+    def update(self, address: Address, body):
+        """
+        :param address: the device (addr, port)
+        :param body: a decoded body, only StateGroup and StateLocation are considered
+        """
+        if isinstance(body, light.StateGroup):
+            self._groups.update(address, body.group, body.label, body.updated_at)
+        elif isinstance(body, light.StateLocation):
+            self._locations.update(
+                address, body.location, body.label, body.updated_at
+            )
+
+    def group(self, group: str) -> FrozenSet[Address]:
+        """
+        :param group: a group id
+        :return: the addresses of the devices in the group
+        """
+        return self._groups.members(group)
+
+    def location(self, location: str) -> FrozenSet[Address]:
+        """
+        :param location: a location id
+        :return: the addresses of the devices in the location
+        """
+        return self._locations.members(location)
+
+    def group_of(self, address: Address) -> str:
+        return self._groups.of(address)
+
+    def location_of(self, address: Address) -> str:
+        return self._locations.of(address)
+
+    def groups(self) -> Dict[str, str]:
+        """
+        :return: a dict group id -> label
+        """
+        return self._groups.labels()
+
+    def locations(self) -> Dict[str, str]:
+        """
+        :return: a dict location id -> label
+        """
+        return self._locations.labels()
+
+
+class _Membership(object):
+    def __init__(self):
+        self._members = {}  # type: Dict[str, FrozenSet[Address]]
+        self._of = {}  # type: Dict[Address, str]
+        self._labels = {}  # type: Dict[str, Tuple[int, str]]
+
+    def update(self, address: Address, key: str, label: str, updated_at: int):
+        previous = self._of.get(address)
+        if previous != key:
+            if previous is not None:
+                self._members[previous] = self._members[previous] - {address}
+                if not self._members[previous]:
+                    del self._members[previous]
+                    del self._labels[previous]
+            self._members[key] = self._members.get(key, frozenset()) | {address}
+            self._of[address] = key
+        if key not in self._labels or self._labels[key][0] <= updated_at:
+            self._labels[key] = (updated_at, label)
+
+    def members(self, key: str) -> FrozenSet[Address]:
+        return self._members.get(key, frozenset())
+
+    def of(self, address: Address) -> str:
+        return self._of.get(address)
+
+    def labels(self) -> Dict[str, str]:
+        return {key: label for key, (_, label) in self._labels.items()}
@@ -1,5 +1,5 @@
 import sys
-import inspect
+import math
 import colorsys
 
 from enum import IntEnum
@@ -13,7 +13,7 @@ from ctypes import (
     LittleEndianStructure,
     Union,
 )
-from typing import Dict, Union as TUnion
+from typing import Dict, NamedTuple, Tuple, Union as TUnion
 
 
 class GetService(LittleEndianStructure):
@@ -164,6 +164,61 @@ class Get(LittleEndianStructure):
         return "Get"
 
 
+class Label:
+    """
+    A UTF-8 label of at most 32 bytes, a character cut in half at the end is replaced
+
+    >>> import lifx
+    >>> body = lifx.lan.light.StateGroup()
+    >>> body.label = "Cucina è"
+    >>> body.label
+    'Cucina è'
+    >>> body.label = "è" * 17
+    >>> body.label == "è" * 16
+    True
+    >>> body.label = "x" + "è" * 16
+    >>> body.label == "x" + "è" * 15 + "\ufffd"
+    True
+    """
+
+    @property
+    def label(self):
+        return (
+            bytes(self.field.label).split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        )
+
+    @label.setter
+    def label(self, value):
+        self.field.label[:] = bytes(value, "utf-8")[:32].ljust(32, b"\0")
+
+
+class StateSnapshot(NamedTuple):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.State_Factory.make("State", {"hue": 120, "saturation": 100, "brightness": 50,
+    ...                                                    "kelvin": 3500, "power": 65535, "label": "Bagno"})
+    >>> snapshot = body.to_snapshot()
+    >>> snapshot
+    StateSnapshot(power=65535, hue=120, saturation=100, brightness=50, kelvin=3500, rgb=(0, 128, 0), label='Bagno')
+    >>> snapshot == lifx.lan.light.State.from_buffer_copy(body).to_snapshot()
+    True
+    >>> len({snapshot, body.to_snapshot()})
+    1
+    >>> snapshot.hue = 0  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    AttributeError: can't set attribute
+    """
+
+    power: int
+    hue: int
+    saturation: int
+    brightness: int
+    kelvin: int
+    rgb: Tuple[int, int, int]
+    label: str
+
+
 class _State(LittleEndianStructure):
     _pack_ = 1
     _fields_ = [
@@ -175,7 +230,7 @@ class _State(LittleEndianStructure):
     ]
 
 
-class State(Color):
+class State(Label, Color):
     """
     >>> import lifx
     >>> body = lifx.lan.light.State()
@@ -226,21 +281,19 @@ class State(Color):
     def power(self, value):
         self.field.power = value
 
-    @property
-    def label(self):
-        lbl = ""
-        for i in range(0, 32):
-            c = chr(self.field.label[i])
-            if c == chr(0):
-                break
-            else:
-                lbl += c
-        return lbl
-
-    @label.setter
-    def label(self, value):
-        for i, byte in enumerate(bytes(value, "utf-8")):
-            self.field.label[i] = byte
+    def to_snapshot(self) -> "StateSnapshot":
+        """
+        :return: an immutable, hashable copy with every field converted once
+        """
+        return StateSnapshot(
+            self.power,
+            self.hue,
+            self.saturation,
+            self.brightness,
+            self.kelvin,
+            self.rgb,
+            self.label,
+        )
 
     def __str__(self):
         color = super(State, self).__str__()
@@ -338,11 +391,11 @@ class SetWaveform(Color):
     state = "set_waveform_light"
 
     class Waveform(IntEnum):
-        saw = (0,)
-        sine = (1,)
-        halfsine = (2,)
-        triangle = (3,)
-        pulse = (4,)
+        saw = 0
+        sine = 1
+        halfsine = 2
+        triangle = 3
+        pulse = 4
 
     _fields_ = [("field", _SetWaveform), ("bytes", c_uint8 * 21)]
 
@@ -452,6 +505,18 @@ class _StatePower(LittleEndianStructure):
     ]
 
 
+class PowerSnapshot(NamedTuple):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.StatePower()
+    >>> body.level = body.ON
+    >>> body.to_snapshot()
+    PowerSnapshot(level=65535)
+    """
+
+    level: int
+
+
 class StatePower(Power, Union):
 
     ON = 65535
@@ -460,11 +525,433 @@ class StatePower(Power, Union):
 
     _fields_ = [("field", _StatePower), ("bytes", c_uint8 * 52)]
 
+    def to_snapshot(self) -> PowerSnapshot:
+        """
+        :return: an immutable, hashable copy
+        """
+        return PowerSnapshot(self.field.level)
+
     def __str__(self):
         level = super(StatePower, self).__str__()
         return "StatePower {{{}}}".format(level)
 
 
+class Membership(Label):
+    @property
+    def updated_at(self):
+        return self.field.updated_at
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self.field.updated_at = value
+
+
+class GetGroup(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_group"
+
+    def __str__(self):
+        return "GetGroup"
+
+
+class _StateGroup(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("group", c_uint8 * 16),
+        ("label", c_uint8 * 32),
+        ("updated_at", c_uint64),
+    ]
+
+
+class StateGroup(Membership, Union):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.StateGroup()
+    >>> body.group = "00112233445566778899aabbccddeeff"
+    >>> body.field.group[15]
+    255
+    >>> body.label = "Kitchen"
+    >>> body.label
+    'Kitchen'
+    >>> body.updated_at = 1644710400000000000
+    >>> str(body)
+    'StateGroup {group: 00112233445566778899aabbccddeeff, label: Kitchen, updated_at: 1644710400000000000}'
+    """
+
+    state = "state_group"
+
+    _fields_ = [("field", _StateGroup), ("bytes", c_uint8 * 56)]
+
+    @property
+    def group(self):
+        return bytes(self.field.group).hex()
+
+    @group.setter
+    def group(self, value):
+        self.field.group[:] = bytes.fromhex(value)
+
+    def __str__(self):
+        return "StateGroup {{group: {}, label: {}, updated_at: {}}}".format(
+            self.group, self.label, self.updated_at
+        )
+
+
+class GetLocation(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_location"
+
+    def __str__(self):
+        return "GetLocation"
+
+
+class _StateLocation(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("location", c_uint8 * 16),
+        ("label", c_uint8 * 32),
+        ("updated_at", c_uint64),
+    ]
+
+
+class StateLocation(Membership, Union):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.StateLocation()
+    >>> body.location = "ffeeddccbbaa99887766554433221100"
+    >>> body.label = "Home"
+    >>> str(body)
+    'StateLocation {location: ffeeddccbbaa99887766554433221100, label: Home, updated_at: 0}'
+    """
+
+    state = "state_location"
+
+    _fields_ = [("field", _StateLocation), ("bytes", c_uint8 * 56)]
+
+    @property
+    def location(self):
+        return bytes(self.field.location).hex()
+
+    @location.setter
+    def location(self, value):
+        self.field.location[:] = bytes.fromhex(value)
+
+    def __str__(self):
+        return "StateLocation {{location: {}, label: {}, updated_at: {}}}".format(
+            self.location, self.label, self.updated_at
+        )
+
+
+class Echo:
+    @property
+    def payload(self):
+        return bytes(self.field.payload)
+
+    @payload.setter
+    def payload(self, value):
+        self.field.payload[:] = bytes(value)[:64].ljust(64, b"\0")
+
+
+class _Echo(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("payload", c_uint8 * 64),
+    ]
+
+
+class EchoRequest(Echo, Union):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.EchoRequest()
+    >>> body.payload = b"ping"
+    >>> body.payload[:6]
+    b'ping\\x00\\x00'
+    """
+
+    state = "echo_request"
+
+    _fields_ = [("field", _Echo), ("bytes", c_uint8 * 64)]
+
+    def __str__(self):
+        return "EchoRequest {{payload: {}}}".format(self.payload.hex())
+
+
+class EchoResponse(Echo, Union):
+
+    state = "echo_response"
+
+    _fields_ = [("field", _Echo), ("bytes", c_uint8 * 64)]
+
+    def __str__(self):
+        return "EchoResponse {{payload: {}}}".format(self.payload.hex())
+
+
+class Signal:
+    @property
+    def signal(self):
+        return self.field.signal
+
+    @property
+    def rssi(self):
+        """
+        Signal strength in dBm, None when unknown
+        """
+        if self.field.signal <= 0:
+            return None
+        return round(10 * math.log10(self.field.signal))
+
+    @property
+    def tx(self):
+        return self.field.tx
+
+    @property
+    def rx(self):
+        return self.field.rx
+
+    def __str__(self):
+        return "rssi: {}, tx: {}, rx: {}".format(self.rssi, self.tx, self.rx)
+
+
+class _StateSignal(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("signal", c_float),
+        ("tx", c_uint32),
+        ("rx", c_uint32),
+        ("", c_int16),
+    ]
+
+
+class GetHostInfo(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_host_info"
+
+    def __str__(self):
+        return "GetHostInfo"
+
+
+class StateHostInfo(Signal, Union):
+
+    state = "state_host_info"
+
+    _fields_ = [("field", _StateSignal), ("bytes", c_uint8 * 14)]
+
+    def __str__(self):
+        signal = super(StateHostInfo, self).__str__()
+        return "StateHostInfo {{{}}}".format(signal)
+
+
+class GetWifiInfo(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_wifi_info"
+
+    def __str__(self):
+        return "GetWifiInfo"
+
+
+class StateWifiInfo(Signal, Union):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.StateWifiInfo()
+    >>> body.field.signal = 1e-6
+    >>> body.field.tx = 2048
+    >>> body.rssi
+    -60
+    >>> str(body)
+    'StateWifiInfo {rssi: -60, tx: 2048, rx: 0}'
+    """
+
+    state = "state_wifi_info"
+
+    _fields_ = [("field", _StateSignal), ("bytes", c_uint8 * 14)]
+
+    def __str__(self):
+        signal = super(StateWifiInfo, self).__str__()
+        return "StateWifiInfo {{{}}}".format(signal)
+
+
+class Firmware:
+    @property
+    def build(self):
+        return self.field.build
+
+    @property
+    def version(self):
+        return "{}.{}".format(self.field.version_major, self.field.version_minor)
+
+    def __str__(self):
+        return "build: {}, version: {}".format(self.build, self.version)
+
+
+class _StateFirmware(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("build", c_uint64),
+        ("", c_uint64),
+        ("version_minor", c_uint16),
+        ("version_major", c_uint16),
+    ]
+
+
+class GetHostFirmware(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_host_firmware"
+
+    def __str__(self):
+        return "GetHostFirmware"
+
+
+class StateHostFirmware(Firmware, Union):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.StateHostFirmware()
+    >>> body.field.version_major = 3
+    >>> body.field.version_minor = 70
+    >>> body.version
+    '3.70'
+    """
+
+    state = "state_host_firmware"
+
+    _fields_ = [("field", _StateFirmware), ("bytes", c_uint8 * 20)]
+
+    def __str__(self):
+        firmware = super(StateHostFirmware, self).__str__()
+        return "StateHostFirmware {{{}}}".format(firmware)
+
+
+class GetWifiFirmware(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_wifi_firmware"
+
+    def __str__(self):
+        return "GetWifiFirmware"
+
+
+class StateWifiFirmware(Firmware, Union):
+
+    state = "state_wifi_firmware"
+
+    _fields_ = [("field", _StateFirmware), ("bytes", c_uint8 * 20)]
+
+    def __str__(self):
+        firmware = super(StateWifiFirmware, self).__str__()
+        return "StateWifiFirmware {{{}}}".format(firmware)
+
+
+class GetVersion(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_version"
+
+    def __str__(self):
+        return "GetVersion"
+
+
+class _StateVersion(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("vendor", c_uint32),
+        ("product", c_uint32),
+        ("version", c_uint32),
+    ]
+
+
+class StateVersion(Union):
+
+    state = "state_version"
+
+    _fields_ = [("field", _StateVersion), ("bytes", c_uint8 * 12)]
+
+    @property
+    def vendor(self):
+        return self.field.vendor
+
+    @property
+    def product(self):
+        return self.field.product
+
+    @property
+    def version(self):
+        return self.field.version
+
+    def __str__(self):
+        return "StateVersion {{vendor: {}, product: {}, version: {}}}".format(
+            self.vendor, self.product, self.version
+        )
+
+
+class GetInfo(LittleEndianStructure):
+
+    _fields_ = []
+
+    state = "get_info"
+
+    def __str__(self):
+        return "GetInfo"
+
+
+class _StateInfo(LittleEndianStructure):
+    _pack_ = 1
+    _fields_ = [
+        ("time", c_uint64),
+        ("uptime", c_uint64),
+        ("downtime", c_uint64),
+    ]
+
+
+class StateInfo(Union):
+    """
+    >>> import lifx
+    >>> body = lifx.lan.light.StateInfo()
+    >>> body.field.uptime = 90 * 10 ** 9
+    >>> body.uptime
+    90.0
+    """
+
+    state = "state_info"
+
+    _fields_ = [("field", _StateInfo), ("bytes", c_uint8 * 24)]
+
+    @property
+    def time(self):
+        """
+        Device time, nanoseconds since epoch
+        """
+        return self.field.time
+
+    @property
+    def uptime(self):
+        """
+        Seconds since the last power on
+        """
+        return self.field.uptime / 1e9
+
+    @property
+    def downtime(self):
+        """
+        Seconds the device was off before the last power on
+        """
+        return self.field.downtime / 1e9
+
+    def __str__(self):
+        return "StateInfo {{time: {}, uptime: {}, downtime: {}}}".format(
+            self.time, self.uptime, self.downtime
+        )
+
+
 class State_Factory(object):
     @staticmethod
     def make(
@@ -536,6 +1023,8 @@ class Description_Factory(object):
         >>> s[1]['brightness'] = 0
         >>> s[1]['saturation'] = 0
         """
+        import inspect
+
         description = {}
         fields = set(
             [
@@ -1,9 +1,18 @@
-from typing import Tuple, Union
+import ctypes
+
+from ctypes import sizeof
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
 from lifx import Msg as Parent, Octect
-from lifx.lan.header import Header
+from lifx.trace import tracer
+from lifx.lan.header import Header, validate
 from lifx.lan import light
 
+Structure = Union[ctypes.Structure, ctypes.Union]
+
+HEADER_SIZE = sizeof(Header)
+
 
 class Msg(Parent):
     """
@@ -53,6 +62,7 @@ class Msg(Parent):
         :param port: an ip port to associate the message with
         :return: a lifx.lan.Msg
         """
+        start = tracer.enabled and perf_counter()
         lfx = []
         header.field.protocol = 1024
         for byte in header.bytes:
@@ -67,10 +77,13 @@ class Msg(Parent):
         size = Octect()
         size.value = len(lfx)
         lfx[0] = size
-        return cls(lfx, addr=addr, port=port)
+        msg = cls(lfx, addr=addr, port=port)
+        if start:
+            tracer.emit("encode", start, len(msg))
+        return msg
 
     def decode(
-        self,
+        self, header: Header = None, pool: "Pool" = None, body: Structure = None
     ) -> Tuple[Header, Union[light.StateService, light.StatePower, light.State]]:
         """
         >>> import lifx
@@ -89,36 +102,184 @@ class Msg(Parent):
         >>> 'SetColor' in s
         True
 
+        :param header: a lifx.lan.Header to fill instead of allocating a new one
+        :param pool: a lifx.lan.msg.Pool to take the header and the body from
+        :param body: a body to fill when the message has its type, see decode_bytes
         :return: a tuple (header, body)
         """
-        header = Header()
-        for index, octect in enumerate(self[0:36]):
-            header.bytes[index] = octect.value
-
-        body = None
-        if header.type == Header.State.get_service:
-            body = light.GetService()
-        if header.type == Header.State.state_service:
-            body = light.StateService()
-        elif header.type == Header.State.get_light:
-            body = light.Get()
-        elif header.type == Header.State.state_light:
-            body = light.State()
-        elif header.type == Header.State.set_color_light:
-            body = light.SetColor()
-        elif header.type == Header.State.set_waveform_light:
-            body = light.SetWaveform()
-        elif header.type == Header.State.get_power_light:
-            body = light.GetPower()
-        elif header.type == Header.State.set_power_light:
-            body = light.SetPower()
-        elif header.type == Header.State.state_power_light:
-            body = light.StatePower()
-
-        if body:
-            for index, octect in enumerate(self[36:]):
-                body.bytes[index] = octect.value
-        else:
+        (header, body) = self.decode_bytes(bytes(self), header, pool, body)
+        if isinstance(body, bytes):
             body = self[36:]
+        return header, body
+
+    @staticmethod
+    def decode_bytes(
+        data: bytes, header: Header = None, pool: "Pool" = None, body: Structure = None
+    ) -> Tuple[Header, Union[light.StateService, light.StatePower, light.State, bytes]]:
+        """
+        Decode a datagram straight from its bytes, without building a lifx.lan.Msg
+
+        Header and body are filled in place when given, the body only when the
+        datagram has its type. Otherwise they are taken from pool, when given,
+        and should be given back with pool.release(header, body) once read:
+        in steady state no protocol structure is allocated per datagram.
+        lifx.lan.client.asynchronous.Client still builds a lifx.lan.Msg per
+        datagram for its tasks, reading a socket directly is needed to decode
+        without allocating.
+
+        >>> import lifx
+        >>> pool = lifx.lan.msg.Pool()
+        >>> body = lifx.lan.light.SetPower()
+        >>> body.level = body.ON
+        >>> data = bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body))
+        >>> (header, body) = lifx.lan.Msg.decode_bytes(data, pool=pool)
+        >>> header.type, body.level
+        (<State.set_power_light: 117>, 65535)
+        >>> pool.release(header, body)
+        >>> (again, _) = lifx.lan.Msg.decode_bytes(data, pool=pool)
+        >>> again is header
+        True
+        >>> mine = lifx.lan.light.SetPower()
+        >>> (_, body) = lifx.lan.Msg.decode_bytes(data, body=mine)
+        >>> body is mine, body.level
+        (True, 65535)
+        >>> (_, body) = lifx.lan.Msg.decode_bytes(data, body=lifx.lan.light.StatePower())
+        >>> type(body).__name__
+        'SetPower'
+
+        :param data: a datagram
+        :param header: a lifx.lan.Header to fill, the pool or a new one is used otherwise
+        :param pool: a lifx.lan.msg.Pool to take the header and the body from
+        :param body: a body to fill when the datagram has its type, the pool
+            or a new one is used otherwise
+        :return: a tuple (header, body), body is the bytes payload for unknown types
+        """
+        start = tracer.enabled and perf_counter()
+        if header is None:
+            header = pool.acquire(Header) if pool else Header()
+        _fill(header, data)
+
+        body_class = BODIES.get(header.field.type)
+        if body_class:
+            if type(body) is not body_class:
+                body = pool.acquire(body_class) if pool else body_class()
+            _fill(body, data[HEADER_SIZE:])
+        else:
+            body = data[HEADER_SIZE:]
 
+        if start:
+            tracer.emit("decode", start, len(data))
         return header, body
+
+
+BODIES = {
+    Header.State.get_service: light.GetService,
+    Header.State.state_service: light.StateService,
+    Header.State.get_light: light.Get,
+    Header.State.state_light: light.State,
+    Header.State.set_color_light: light.SetColor,
+    Header.State.set_waveform_light: light.SetWaveform,
+    Header.State.get_power_light: light.GetPower,
+    Header.State.set_power_light: light.SetPower,
+    Header.State.state_power_light: light.StatePower,
+    Header.State.get_group: light.GetGroup,
+    Header.State.state_group: light.StateGroup,
+    Header.State.get_location: light.GetLocation,
+    Header.State.state_location: light.StateLocation,
+    Header.State.echo_request: light.EchoRequest,
+    Header.State.echo_response: light.EchoResponse,
+    Header.State.get_host_info: light.GetHostInfo,
+    Header.State.state_host_info: light.StateHostInfo,
+    Header.State.get_host_firmware: light.GetHostFirmware,
+    Header.State.state_host_firmware: light.StateHostFirmware,
+    Header.State.get_wifi_info: light.GetWifiInfo,
+    Header.State.state_wifi_info: light.StateWifiInfo,
+    Header.State.get_wifi_firmware: light.GetWifiFirmware,
+    Header.State.state_wifi_firmware: light.StateWifiFirmware,
+    Header.State.get_version: light.GetVersion,
+    Header.State.state_version: light.StateVersion,
+    Header.State.get_info: light.GetInfo,
+    Header.State.state_info: light.StateInfo,
+}
+
+
+def _fill(instance: Structure, data: bytes):
+    view = memoryview(instance).cast("B")
+    size = min(len(view), len(data))
+    view[:size] = data[:size]
+    view[size:] = bytes(len(view) - size)
+
+
+class Pool(object):
+    """
+    Free lists of headers and bodies, one per type
+
+    Used by lifx.lan.Msg.decode_bytes, on datagrams read from a socket:
+    lifx.lan.client.asynchronous.Client tasks get a lifx.lan.Msg built
+    per datagram and do not benefit from it.
+
+    >>> import lifx
+    >>> pool = lifx.lan.msg.Pool(size=1)
+    >>> first, second = pool.acquire(lifx.lan.Header), pool.acquire(lifx.lan.Header)
+    >>> pool.release(first, second)
+    >>> pool.acquire(lifx.lan.Header) is first
+    True
+    """
+
+    def __init__(self, size: int = 16):
+        """
+        :param size: how many released instances are kept per type
+        """
+        self._size = size
+        self._free = {}  # type: Dict[type, List[Structure]]
+
+    def acquire(self, cls: type) -> Structure:
+        free = self._free.get(cls)
+        return free.pop() if free else cls()
+
+    def release(self, *instances: Structure):
+        for instance in instances:
+            if isinstance(instance, (ctypes.Structure, ctypes.Union)):
+                free = self._free.setdefault(type(instance), [])
+                if len(free) < self._size:
+                    free.append(instance)
+
+
+def read_hex(
+    lines: Iterable[str], pool: "Pool" = None
+) -> Iterator[
+    Tuple[Header, Union[light.StateService, light.StatePower, light.State, bytes]]
+]:
+    """
+    Decode a stream of hex encoded messages, one per line
+
+    A line is either plain hex digits (whitespace allowed) or a lifx.Msg
+    representation ("[0x31, 0x00, ...]", as logged by the clients), possibly
+    after a prefix. Blank lines and lines that are not a valid lifx message are skipped.
+
+    >>> import io
+    >>> import lifx
+    >>> log = io.StringIO(
+    ...     "310000340000000000000000000000000000000000000000000000000000000066000000005555FFFFFFFFAC0D00040000\\n"
+    ...     "\\n"
+    ...     "not a message\\n"
+    ...     "read    [0x24, 0x00, 0x00, 0x34, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, "
+    ...     "0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x74, 0x00, 0x00, 0x00]\\n"
+    ... )
+    >>> [header.type for (header, body) in lifx.lan.msg.read_hex(log)]
+    [<State.set_color_light: 102>, <State.get_power_light: 116>]
+
+    :param lines: an iterable of strings, for example an open text file
+    :param pool: a lifx.lan.msg.Pool to take headers and bodies from
+    :return: an iterator of (header, body), see lifx.lan.Msg.decode_bytes
+    """
+    for line in lines:
+        try:
+            if "[" in line:
+                line = line[line.index("[") + 1 : line.rindex("]")]
+                line = line.replace("0x", "").replace(",", "")
+            data = bytes.fromhex(line)
+        except ValueError:
+            continue
+        if validate(data) is None:
+            yield Msg.decode_bytes(data, pool=pool)
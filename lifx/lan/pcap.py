@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import socket
+import struct
+import sys
+
+import lifx
+
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Tuple, Union
+
+
+Address = Tuple[str, int]
+
+PORT = 56700
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_VLAN = (0x8100, 0x88A8)
+IPPROTO_UDP = 17
+
+_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+
+
+class Packet(NamedTuple):
+    """
+    A captured Lifx datagram, decoded on demand
+    """
+
+    timestamp: float
+    src: Address
+    dst: Address
+    payload: bytes
+
+    @property
+    def msg(self) -> "lifx.lan.Msg":
+        return lifx.lan.Msg.from_bytes(self.payload, addr=self.src[0], port=self.src[1])
+
+    def decode(self):
+        """
+        :return: a tuple (header, body)
+        """
+        return self.msg.decode()
+
+
+def read(capture: Union[str, BinaryIO], port: int = PORT) -> Iterator[Packet]:
+    """
+    Stream the UDP datagrams to or from port out of a pcap file,
+    one record at a time
+
+    >>> import io
+    >>> import struct
+    >>> import lifx
+    >>> body = lifx.lan.light.GetPower()
+    >>> data = bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body))
+    >>> udp = struct.pack("!HHHH", 56700, 56700, 8 + len(data), 0) + data
+    >>> ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(udp), 0, 0, 64, 17, 0,
+    ...                  bytes([192, 168, 1, 2]), bytes([192, 168, 1, 10])) + udp
+    >>> frame = bytes(12) + struct.pack("!H", 0x0800) + ip
+    >>> capture = io.BytesIO(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1)
+    ...                      + struct.pack("<IIII", 10, 500000, len(frame), len(frame)) + frame)
+    >>> packets = list(lifx.lan.pcap.read(capture))
+    >>> packets[0].timestamp, packets[0].src, packets[0].dst
+    (10.5, ('192.168.1.2', 56700), ('192.168.1.10', 56700))
+    >>> (header, body) = packets[0].decode()
+    >>> header.type
+    <State.get_power_light: 116>
+    >>> capture = io.BytesIO(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 34, 1)
+    ...                      + struct.pack("<IIII", 10, 0, 10, 10) + frame[:10]
+    ...                      + struct.pack("<IIII", 11, 0, 34, len(frame)) + frame[:34])
+    >>> list(lifx.lan.pcap.read(capture))
+    []
+
+    :param capture: a path or a binary file object positioned at the pcap global header
+    :param port: the UDP port to keep, None keeps every datagram
+    :return: a generator of lifx.lan.pcap.Packet
+    """
+    if isinstance(capture, str):
+        with open(capture, "rb") as f:
+            yield from read(f, port)
+        return
+
+    header = capture.read(24)
+    if len(header) < 24 or header[:4] not in _MAGIC:
+        raise ValueError("not a pcap file")
+    (endianness, resolution) = _MAGIC[header[:4]]
+    linktype = struct.unpack(endianness + "I", header[20:24])[0] & 0x0FFFFFFF
+    record = struct.Struct(endianness + "IIII")
+
+    while True:
+        head = capture.read(record.size)
+        if len(head) < record.size:
+            return
+        (seconds, fraction, length, _) = record.unpack(head)
+        frame = capture.read(length)
+        if len(frame) < length:
+            return
+        datagram = _udp(frame, linktype, endianness)
+        if datagram is None:
+            continue
+        (src, dst, payload) = datagram
+        if port is None or port in (src[1], dst[1]):
+            yield Packet(seconds + fraction * resolution, src, dst, payload)
+
+
+def _udp(frame: bytes, linktype: int, endianness: str):
+    # runt frames and frames cut short by the capture snaplen are skipped
+    if linktype == LINKTYPE_ETHERNET:
+        offset = 12
+        if len(frame) < offset + 2:
+            return None
+        (ethertype,) = struct.unpack_from("!H", frame, offset)
+        while ethertype in ETHERTYPE_VLAN:
+            offset += 4
+            if len(frame) < offset + 2:
+                return None
+            (ethertype,) = struct.unpack_from("!H", frame, offset)
+        if ethertype != ETHERTYPE_IPV4:
+            return None
+        offset += 2
+    elif linktype == LINKTYPE_LINUX_SLL:
+        if len(frame) < 16 or struct.unpack_from("!H", frame, 14)[0] != ETHERTYPE_IPV4:
+            return None
+        offset = 16
+    elif linktype == LINKTYPE_NULL:
+        if (
+            len(frame) < 4
+            or struct.unpack_from(endianness + "I", frame)[0] != socket.AF_INET
+        ):
+            return None
+        offset = 4
+    elif linktype in (LINKTYPE_RAW, LINKTYPE_IPV4):
+        offset = 0
+    else:
+        raise ValueError("unsupported pcap link type {}".format(linktype))
+
+    if len(frame) < offset + 20 or frame[offset] >> 4 != 4:
+        return None
+    ihl = (frame[offset] & 0x0F) * 4
+    (total, fragment, protocol) = struct.unpack_from("!2xH2xHxB", frame, offset)
+    if protocol != IPPROTO_UDP or fragment & 0x3FFF:
+        return None
+    src = socket.inet_ntoa(frame[offset + 12 : offset + 16])
+    dst = socket.inet_ntoa(frame[offset + 16 : offset + 20])
+    udp = offset + ihl
+    if len(frame) < udp + 8:
+        return None
+    (sport, dport, length) = struct.unpack_from("!HHH", frame, udp)
+    payload = frame[udp + 8 : min(udp + length, offset + total)]
+    return (src, sport), (dst, dport), payload
+
+
+class Replay(asyncio.DatagramProtocol):
+    """
+    Send captured datagrams again to a single remote, keeping their original pacing
+
+    Example::
+
+        import asyncio
+        import lifx
+
+        packets = (packet for packet in lifx.lan.pcap.read("site.pcap") if packet.dst[1] == 56700)
+        loop = asyncio.get_event_loop()
+        transport, protocol = loop.run_until_complete(
+            loop.create_datagram_endpoint(lifx.lan.pcap.Replay, remote_addr=("127.0.0.1", 56700))
+        )
+        loop.run_until_complete(protocol.replay(packets, speed=10))
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_event_loop()
+        self._transport = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def connection_made(self, transport: asyncio.transports.DatagramTransport):
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr: Address):
+        self.logger.info(
+            "read    {} from {}".format(lifx.lan.Msg.from_bytes(data), addr)
+        )
+
+    async def replay(self, packets: Iterable[Packet], speed: float = 1) -> int:
+        """
+        :param packets: captured packets, in capture order
+        :param speed: 1 replays at the original pace, 10 ten times faster, 0 as fast as possible
+        :return: the number of datagrams sent
+        """
+        count = 0
+        origin = None
+        start = self._loop.time()
+        for packet in packets:
+            if origin is None:
+                origin = packet.timestamp
+            if speed:
+                delay = start + (packet.timestamp - origin) / speed - self._loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._transport.sendto(packet.payload)
+            count += 1
+        return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Decode or replay Lifx traffic from a pcap file"
+    )
+    parser.add_argument("capture")
+    parser.add_argument(
+        "--replay", metavar="HOST:PORT", help="send the datagrams to HOST:PORT"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1, help="replay speed factor, 0 for no pacing"
+    )
+    parser.add_argument("--source", help="only datagrams sent by this address")
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    captured = (
+        packet
+        for packet in read(args.capture)
+        if args.source is None or packet.src[0] == args.source
+    )
+    if args.replay:
+        (host, port) = args.replay.rsplit(":", 1)
+        loop = asyncio.get_event_loop()
+        transport, protocol = loop.run_until_complete(
+            loop.create_datagram_endpoint(Replay, remote_addr=(host, int(port)))
+        )
+        sent = loop.run_until_complete(protocol.replay(captured, args.speed))
+        logger.info("replayed {} datagrams".format(sent))
+        transport.close()
+        loop.close()
+    else:
+        for captured_packet in captured:
+            (header, body) = captured_packet.decode()
+            print(
+                "{:.6f} {}:{} -> {}:{} {} {}".format(
+                    captured_packet.timestamp,
+                    *captured_packet.src,
+                    *captured_packet.dst,
+                    header,
+                    body
+                )
+            )
@@ -0,0 +1,184 @@
+from typing import Any, Dict, List, Mapping, NamedTuple, Tuple
+
+import lifx
+
+from lifx.lan import header as lan_header
+from lifx.lan import light
+
+
+Address = Tuple[str, int]
+Template = Tuple["lifx.lan.Header", Any, List[Address]]
+
+COLOR = ("hue", "saturation", "brightness", "kelvin")
+
+
+class Tolerance(NamedTuple):
+    """
+    Largest differences still considered equal, in lifx.lan.light.Color units
+    """
+
+    hue: int = 1
+    saturation: int = 1
+    brightness: int = 1
+    kelvin: int = 50
+
+
+class Scene(object):
+    """
+    Desired states of many devices, sent as the messages needed to get there
+    from the last known states
+
+    A desired state is a dict with any of "hue", "saturation", "brightness", "kelvin",
+    "power" (lifx.lan.light.SetPower.ON or OFF) and "duration"; color channels left
+    out keep their known value, so a device of unknown color needs all four.
+    A "color" of raw (hue, saturation, brightness, kelvin) protocol values instead
+    is sent as it is, without rounding through degrees and percents.
+    A known state is any object exposing the same attributes, like a decoded
+    lifx.lan.light.State or a lifx.lan.table.Row (build the mapping with
+    {row.address: row for row in table}).
+
+    >>> import lifx
+    >>> kitchen = {"hue": 120, "saturation": 100, "brightness": 80, "kelvin": 3500, "power": 65535}
+    >>> scene = lifx.lan.scene.Scene({
+    ...     ("192.168.1.10", 56700): kitchen,
+    ...     ("192.168.1.11", 56700): kitchen,
+    ...     ("192.168.1.12", 56700): {"power": 0},
+    ... })
+    >>> known = lifx.lan.light.State_Factory.make("State", kitchen)
+    >>> off = lifx.lan.light.State_Factory.make("State", dict(kitchen, hue=121, power=0))
+    >>> plan = scene.plan({("192.168.1.10", 56700): known, ("192.168.1.11", 56700): off})
+    >>> [(header.type.name, str(body), addresses) for (header, body, addresses) in plan]
+    [('set_power_light', 'SetPower {level: 65535}', [('192.168.1.11', 56700)]), ('set_power_light', 'SetPower {level: 0}', [('192.168.1.12', 56700)])]
+    >>> dimmed = lifx.lan.scene.Scene({("192.168.1.10", 56700): {"brightness": 50}})
+    >>> [str(body) for (header, body, addresses) in dimmed.plan({("192.168.1.10", 56700): known})]
+    ['SetColor {hue: 120, saturation: 100, brightness: 50, kelvin: 3500, rgb: (0, 128, 0), duration: 0}']
+    >>> dimmed.plan({})
+    Traceback (most recent call last):
+    ...
+    ValueError: 192.168.1.10 has an unknown color, its desired state needs all of hue, saturation, brightness, kelvin
+    >>> exact = lifx.lan.scene.Scene({("192.168.1.10", 56700): {"color": (21846, 65535, 52429, 3500)}})
+    >>> [(header, body, addresses)] = exact.plan({})
+    >>> color = body.field.color
+    >>> color.hue, color.saturation, color.brightness, color.kelvin
+    (21846, 65535, 52429, 3500)
+    >>> exact.plan({("192.168.1.10", 56700): known})
+    []
+    >>> msgs = scene.messages({})
+    >>> [(lifx.lan.Msg.decode_bytes(bytes(msg))[0].type.name, msg.addr) for msg in msgs]
+    [('set_color_light', '192.168.1.10'), ('set_color_light', '192.168.1.11'), ('set_power_light', '192.168.1.10'), ('set_power_light', '192.168.1.11'), ('set_power_light', '192.168.1.12')]
+    """
+
+    def __init__(
+        self, desired: Mapping[Address, Dict], tolerance: Tolerance = Tolerance()
+    ):
+        """
+        :param desired: a dict (addr, port) -> desired state
+        :param tolerance: a lifx.lan.scene.Tolerance
+        """
+        self._desired = desired
+        self._tolerance = tolerance
+
+    def plan(self, known: Mapping[Address, Any]) -> List[Template]:
+        """
+        Compare desired and known states; devices needing the same message share it
+
+        :param known: a dict (addr, port) -> last known state, unknown devices get every message
+        :return: a list of (header, body, addresses), colors before powers
+            so that devices turned on show the new color at once
+        """
+        colors = {}  # type: Dict[Tuple, List[Address]]
+        powers = {}  # type: Dict[int, List[Address]]
+        for address, desired in self._desired.items():
+            state = known.get(address)
+            power = desired.get("power")
+            if power is not None and (
+                state is None or bool(state.power) != bool(power)
+            ):
+                level = light.SetPower.ON if power else light.SetPower.OFF
+                powers.setdefault(level, []).append(address)
+            if power is not None and not power:
+                continue
+            raw = desired.get("color")
+            if raw is not None:
+                color = self._units(raw)
+            else:
+                color = dict((name, desired[name]) for name in COLOR if name in desired)
+            if color and (state is None or not self.similar(color, state)):
+                if raw is not None:
+                    values = tuple(
+                        ("raw_" + name, value) for (name, value) in zip(COLOR, raw)
+                    )
+                else:
+                    values = self._complete(address, color, state)
+                key = values + (("duration", desired.get("duration", 0)),)
+                colors.setdefault(key, []).append(address)
+
+        plan = []
+        for values, addresses in colors.items():
+            body = light.SetColor()
+            for (name, value) in values:
+                if name.startswith("raw_"):
+                    setattr(body.field.color, name[4:], value)
+                else:
+                    setattr(body, name, value)
+            plan.append((lan_header.make(body.state), body, addresses))
+        for level, addresses in powers.items():
+            body = light.State_Factory.make("SetPower", {"level": level})
+            plan.append((lan_header.make(body.state), body, addresses))
+        return plan
+
+    def messages(self, known: Mapping[Address, Any]) -> List["lifx.lan.Msg"]:
+        """
+        :param known: a dict (addr, port) -> last known state
+        :return: the messages to send, every template is encoded once
+        """
+        msgs = []
+        for (header, body, addresses) in self.plan(known):
+            template = lifx.lan.Msg.encode(header, body)
+            msgs.extend(
+                lifx.lan.Msg(template, addr=addr, port=port)
+                for (addr, port) in addresses
+            )
+        return msgs
+
+    @staticmethod
+    def _units(raw: Tuple[int, int, int, int]) -> Dict:
+        body = light.SetColor()
+        color = body.field.color
+        (color.hue, color.saturation, color.brightness, color.kelvin) = raw
+        return dict((name, getattr(body, name)) for name in COLOR)
+
+    @staticmethod
+    def _complete(address: Address, color: Dict, state: Any) -> Tuple:
+        """
+        A SetColor sets all of hue, saturation, brightness and kelvin: the channels
+        missing from a desired state keep their known values, raw when available
+        """
+        if len(color) == len(COLOR):
+            return tuple((name, color[name]) for name in COLOR)
+        if state is None or not getattr(state, "kelvin", 0):
+            raise ValueError(
+                "{} has an unknown color, its desired state needs all of {}".format(
+                    address[0], ", ".join(COLOR)
+                )
+            )
+        known = getattr(getattr(state, "field", None), "color", None)
+        values = []
+        for name in COLOR:
+            if name in color:
+                values.append((name, color[name]))
+            elif known is not None:
+                values.append(("raw_" + name, getattr(known, name)))
+            else:
+                values.append((name, getattr(state, name)))
+        return tuple(values)
+
+    def similar(self, desired: Dict, state: Any) -> bool:
+        for name in COLOR:
+            if name in desired:
+                difference = abs(desired[name] - getattr(state, name))
+                if name == "hue":
+                    difference = min(difference, 360 - difference)
+                if difference > getattr(self._tolerance, name):
+                    return False
+        return True
@@ -0,0 +1,192 @@
+import mmap
+import os
+
+from ctypes import c_uint32, LittleEndianStructure, sizeof
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from lifx.lan.scene import Scene, Template, Tolerance
+from lifx.lan.table import Row, TARGET
+
+
+Address = Tuple[str, int]
+
+ROW_SIZE = sizeof(Row)
+
+
+class _Layout(LittleEndianStructure):
+    _fields_ = [
+        ("magic", c_uint32),
+        ("row_size", c_uint32),
+        ("count", c_uint32),
+    ]
+
+
+MAGIC = 0x5346584C
+
+
+def save(path: str, rows: Iterable[Row]) -> int:
+    """
+    Write device states to a snapshot file, replacing it atomically
+
+    :param path: the snapshot file
+    :param rows: lifx.lan.table.Row states, for example a lifx.lan.table.Table
+    :return: the number of devices saved
+    """
+    rows = [bytes(row) for row in rows]
+    layout = _Layout(magic=MAGIC, row_size=ROW_SIZE, count=len(rows))
+    temporary = "{}.tmp".format(path)
+    with open(temporary, "wb") as f:
+        f.write(bytes(layout))
+        f.write(b"".join(rows))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return len(rows)
+
+
+class Snapshot(object):
+    """
+    The fleet state saved by lifx.lan.snapshot.save, memory mapped read only
+
+    Records have a fixed size (the lifx.lan.table.Row layout): one is copied out
+    of the file only when accessed. restore() sends back, at a bounded rate,
+    the SetColor and SetPower commands needed by the devices whose current state
+    differs from the saved one.
+
+    >>> import os
+    >>> import tempfile
+    >>> import lifx
+    >>> row = lifx.lan.table.Row()
+    >>> row.field.target[:] = bytes.fromhex("d073d5121af10000")
+    >>> row.field.addr[:] = bytes([192, 168, 1, 10])
+    >>> row.field.port = 56700
+    >>> row.field.power = 65535
+    >>> color = row.field.color
+    >>> (color.hue, color.saturation, color.brightness, color.kelvin) = (21846, 65535, 52429, 3500)
+    >>> directory = tempfile.TemporaryDirectory()
+    >>> path = os.path.join(directory.name, "fleet.snapshot")
+    >>> lifx.lan.snapshot.save(path, [row])
+    1
+    >>> snapshot = lifx.lan.snapshot.Snapshot(path)
+    >>> saved = snapshot.get("d073d5121af10000")
+    >>> saved.address, saved.power, saved.hue, saved.kelvin
+    (('192.168.1.10', 56700), 65535, 120, 3500)
+    >>> snapshot.desired()
+    {('192.168.1.10', 56700): {'power': 65535, 'duration': 0, 'color': (21846, 65535, 52429, 3500)}}
+    >>> off = lifx.lan.light.State_Factory.make("State", {"hue": 120, "saturation": 100, "brightness": 80, "kelvin": 3500, "power": 0})
+    >>> [(header.type.name, addresses) for (header, body, addresses) in snapshot.plan({saved.address: off})]
+    [('set_power_light', [('192.168.1.10', 56700)])]
+    >>> snapshot.plan({saved.address: saved})
+    []
+    >>> snapshot.close()
+    >>> directory.cleanup()
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: a file written by lifx.lan.snapshot.save
+        """
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        layout = _Layout.from_buffer_copy(self._map)
+        if layout.magic != MAGIC or layout.row_size != ROW_SIZE:
+            self._map.close()
+            raise ValueError("{} is not a lifx state snapshot".format(path))
+        self._count = layout.count
+        self._index = None  # type: Optional[Dict[bytes, int]]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Row:
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        return Row.from_buffer_copy(self._map, sizeof(_Layout) + index * ROW_SIZE)
+
+    def __iter__(self) -> Iterator[Row]:
+        for index in range(self._count):
+            yield self[index]
+
+    def get(self, target: str) -> Optional[Row]:
+        """
+        :param target: a device target (MAC address as 16 hex digits)
+        :return: the saved device state, None when the device is not in the snapshot
+        """
+        if self._index is None:
+            offset = sizeof(_Layout) + TARGET.start
+            size = TARGET.stop - TARGET.start
+            self._index = {
+                self._map[start : start + size]: index
+                for index, start in enumerate(
+                    range(offset, offset + self._count * ROW_SIZE, ROW_SIZE)
+                )
+            }
+        index = self._index.get(bytes.fromhex(target))
+        return None if index is None else self[index]
+
+    def desired(self, duration: int = 0) -> Dict[Address, Dict]:
+        """
+        :param duration: the color transition time in milliseconds
+        :return: a dict (addr, port) -> desired state, as lifx.lan.scene.Scene takes;
+            with the raw saved color; devices never seen in a State reply (kelvin 0)
+            get their power only
+        """
+        desired = {}
+        for row in self:
+            state = {"power": row.power, "duration": duration}
+            color = row.field.color
+            if color.kelvin:
+                state.update(
+                    color=(color.hue, color.saturation, color.brightness, color.kelvin)
+                )
+            desired[row.address] = state
+        return desired
+
+    def plan(
+        self,
+        known: Mapping[Address, Any],
+        tolerance: Tolerance = Tolerance(),
+        duration: int = 0,
+    ) -> List[Template]:
+        """
+        :param known: a dict (addr, port) -> current state, see lifx.lan.scene.Scene.plan
+        :param tolerance: a lifx.lan.scene.Tolerance
+        :param duration: the color transition time in milliseconds
+        :return: a list of (header, body, addresses)
+        """
+        return Scene(self.desired(duration), tolerance).plan(known)
+
+    async def restore(
+        self,
+        client: "lifx.lan.client.asynchronous.Client",
+        known: Mapping[Address, Any] = None,
+        tolerance: Tolerance = Tolerance(),
+        duration: int = 0,
+        rate: float = 20,
+    ) -> int:
+        """
+        Bring the devices back to the saved state, for example::
+
+            snapshot = lifx.lan.snapshot.Snapshot("fleet.snapshot")
+            await snapshot.restore(client, {row.address: row for row in table})
+
+        :param client: a lifx.lan.client.asynchronous.Client
+        :param known: a dict (addr, port) -> current state, devices already in the
+            saved state are skipped; every device gets every message when None
+        :param tolerance: a lifx.lan.scene.Tolerance
+        :param duration: the color transition time in milliseconds
+        :param rate: the maximum number of messages per second
+        :return: the number of messages sent
+        """
+        msgs = Scene(self.desired(duration), tolerance).messages(known or {})
+        await client.write(msgs, interval=1 / rate)
+        return len(msgs)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
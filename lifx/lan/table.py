@@ -0,0 +1,269 @@
+import inspect
+import logging
+import socket
+import time
+
+from ctypes import (
+    c_double,
+    c_uint8,
+    c_uint16,
+    c_uint32,
+    LittleEndianStructure,
+    sizeof,
+)
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterator, Optional, Tuple
+
+from lifx.lan.light import Color, HSBK, State, StatePower
+
+
+Address = Tuple[str, int]
+
+
+# python 3.13 can open a segment without handing it to the resource tracker,
+# which otherwise unlinks it when any process that opened it exits
+_HAS_TRACK = "track" in inspect.signature(shared_memory.SharedMemory).parameters
+
+
+def _open(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    if _HAS_TRACK:
+        return shared_memory.SharedMemory(name, create, size, track=False)
+    shm = shared_memory.SharedMemory(name, create, size)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class _Layout(LittleEndianStructure):
+    _fields_ = [
+        ("magic", c_uint32),
+        ("size", c_uint32),
+        ("count", c_uint32),
+    ]
+
+
+class _Row(LittleEndianStructure):
+    _fields_ = [
+        ("version", c_uint32),
+        ("target", c_uint8 * 8),
+        ("addr", c_uint8 * 4),
+        ("port", c_uint16),
+        ("power", c_uint16),
+        ("color", HSBK),
+        ("last_seen", c_double),
+    ]
+
+
+# where the device target sits in a lifx.lan.table.Row
+TARGET = slice(_Row.target.offset, _Row.target.offset + _Row.target.size)
+
+
+class Row(Color):
+    """
+    A device state: hue, saturation, brightness, kelvin and rgb
+    come from lifx.lan.light.Color
+    """
+
+    _fields_ = [("field", _Row), ("bytes", c_uint8 * sizeof(_Row))]
+
+    @property
+    def target(self) -> str:
+        return bytes(self.field.target).hex()
+
+    @property
+    def address(self) -> Address:
+        return socket.inet_ntoa(bytes(self.field.addr)), self.field.port
+
+    @property
+    def power(self) -> int:
+        return self.field.power
+
+    @property
+    def last_seen(self) -> float:
+        return self.field.last_seen
+
+    def __str__(self):
+        color = super(Row, self).__str__()
+        return "Row {{target: {}, address: {}, power: {}, {}, last_seen: {}}}".format(
+            self.target, self.address, self.power, color, self.last_seen
+        )
+
+
+class Table(object):
+    """
+    A fixed size table of device states in shared memory, one row per device
+
+    A single process (the one running the client) writes it from decoded
+    State and StatePower replies, any number of processes attach to it by name
+    and read it without locks: every row carries a sequence counter, odd while
+    the row is being written, and readers retry until they copy a stable row.
+
+    >>> import lifx
+    >>> msg = lifx.lan.Msg.from_bytes([0x58, 0x00, 0x00, 0x54, 0xB9, 0x71, 0x5D, 0x07, 0xD0, 0x73, 0xD5, 0x12, 0x1A, 0xF1, 0x00, 0x00, 0x4C, 0x49, 0x46, 0x58, 0x56, 0x32, 0x00, 0x4D, 0x18, 0x52, 0x42, 0x1E, 0xB5, 0xFC, 0x82, 0x14, 0x6B, 0x00, 0x00, 0x00, 0x71, 0x7E, 0xCC, 0x4C, 0x09, 0x57, 0xAC, 0x0D, 0x00, 0x00, 0xFF, 0xFF, 0x4C, 0x49, 0x46, 0x58, 0x20, 0x42, 0x75, 0x6C, 0x62, 0x20, 0x31, 0x32, 0x31, 0x61, 0x66, 0x31, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00], "192.168.1.10", 56700)
+    >>> (header, body) = msg.decode()
+    >>> table = lifx.lan.table.Table.create(size=16)
+    >>> table.update(("192.168.1.10", 56700), header, body, now=1.5)
+    >>> reader = lifx.lan.table.Table.attach(table.name)
+    >>> row = reader.get("d073d5121af10000")
+    >>> row.address, row.power, row.hue, row.saturation, row.brightness, row.kelvin, row.last_seen
+    (('192.168.1.10', 56700), 65535, 178, 30, 34, 3500, 1.5)
+    >>> [row.target for row in reader]
+    ['d073d5121af10000']
+    >>> table.update(("fe80::1", 56700), header, body)
+    Traceback (most recent call last):
+    ...
+    ValueError: fe80::1 is not an IPv4 address
+    >>> reader.get("d073d5121af10000").address
+    ('192.168.1.10', 56700)
+    >>> reader.close()
+    >>> table.close()
+    >>> table.unlink()
+    """
+
+    MAGIC = 0x4C494658
+    # a row still odd after that many reads has been left half written
+    READ_RETRIES = 10000
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self._shm = shm
+        self._layout = _Layout.from_buffer(shm.buf)
+        if self._layout.magic != self.MAGIC:
+            raise ValueError("{} is not a lifx state table".format(shm.name))
+        self._rows = (_Row * self._layout.size).from_buffer(shm.buf, sizeof(_Layout))
+        self._index = {}
+
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def create(cls, size: int = 256, name: str = None) -> "Table":
+        """
+        :param size: the maximum number of devices
+        :param name: the shared memory name, a random one when None
+        :return: a lifx.lan.table.Table
+        """
+        shm = _open(name, create=True, size=sizeof(_Layout) + size * sizeof(_Row))
+        layout = _Layout.from_buffer(shm.buf)
+        layout.size = size
+        layout.magic = cls.MAGIC
+        del layout
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name: str) -> "Table":
+        """
+        :param name: the name of a table created by another process
+        :return: a lifx.lan.table.Table
+        """
+        shm = _open(name)
+        return cls(shm)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    async def __call__(self, msg: "lifx.lan.Msg"):
+        (header, body) = msg.decode()
+        self.update((msg.addr, msg.port), header, body)
+
+    def update(
+        self, address: Address, header: "lifx.lan.Header", body, now: float = None
+    ):
+        """
+        Write the state of the device sending a reply (only one process may write)
+
+        :param address: the device (addr, port)
+        :param header: the reply header, its target identifies the device
+        :param body: a lifx.lan.light.State or lifx.lan.light.StatePower, others are ignored
+        :param now: the reply timestamp, time.time() when None
+        :raise ValueError: when address is not an IPv4 (addr, port)
+        """
+        if not isinstance(body, (State, StatePower)):
+            return
+        try:
+            addr = socket.inet_aton(address[0])
+        except OSError:
+            raise ValueError("{} is not an IPv4 address".format(address[0])) from None
+        if not 0 <= address[1] <= 0xFFFF:
+            raise ValueError("{} is not a port".format(address[1]))
+        target = bytes(header.field.target)
+        row = self._row(target)
+        if row is None:
+            self.logger.warning("state table {} is full".format(self.name))
+            return
+        row.version += 1
+        row.target[:] = target
+        row.addr[:] = addr
+        row.port = address[1]
+        if isinstance(body, State):
+            row.color = body.field.color
+            row.power = body.field.power
+        else:
+            row.power = body.field.level
+        row.last_seen = time.time() if now is None else now
+        row.version += 1
+
+    def get(self, target: str) -> Optional[Row]:
+        """
+        :param target: a device target (MAC address as 16 hex digits)
+        :return: a copy of the device row, None when the device is unknown
+        """
+        target = bytes.fromhex(target)
+        if target not in self._index:
+            self._scan()
+        if target not in self._index:
+            return None
+        return self._read(self._rows[self._index[target]])
+
+    def __iter__(self) -> Iterator[Row]:
+        for index in range(self._layout.count):
+            yield self._read(self._rows[index])
+
+    def __len__(self) -> int:
+        return self._layout.count
+
+    def close(self):
+        """
+        Release this process view; the table lives on until unlink()
+        """
+        del self._rows
+        del self._layout
+        self._shm.close()
+
+    def unlink(self):
+        """
+        Destroy the table, it has to be called explicitly: tables outlive the processes using them
+        """
+        if not _HAS_TRACK:
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+    def _row(self, target: bytes) -> Optional[_Row]:
+        index = self._index.get(target)
+        if index is None:
+            self._scan()
+            index = self._index.get(target)
+        if index is None:
+            if self._layout.count >= self._layout.size:
+                return None
+            index = self._layout.count
+            self._rows[index].target[:] = target
+            self._layout.count += 1
+            self._index[target] = index
+        return self._rows[index]
+
+    def _scan(self):
+        for index in range(len(self._index), self._layout.count):
+            self._index[bytes(self._rows[index].target)] = index
+
+    @classmethod
+    def _read(cls, row: _Row) -> Row:
+        for _ in range(cls.READ_RETRIES):
+            version = row.version
+            if not version % 2:
+                copy = Row.from_buffer_copy(row)
+                if row.version == version:
+                    return copy
+        raise RuntimeError(
+            "row {} is still being written after {} reads".format(
+                bytes(row.target).hex(), cls.READ_RETRIES
+            )
+        )
@@ -1,6 +1,9 @@
 import abc
-from typing import Iterable, Tuple, Any
+from typing import Iterable, List, Tuple, Any
 from ctypes import c_uint8, LittleEndianStructure, Union
+from time import perf_counter
+
+from lifx.trace import tracer
 
 
 class Msg(abc.ABC, list):
@@ -40,21 +43,11 @@ class Msg(abc.ABC, list):
         :param port: an IP port bound to this message
         :return: a lifx.Msg
         """
-        high_nibbles = [
-            int(nibble, 16) for index, nibble in enumerate(s) if not index % 2
-        ]
-        low_nibbles = [int(nibble, 16) for index, nibble in enumerate(s) if index % 2]
-        return cls(
-            map(
-                lambda high_nibble, low_nibble: Octect(
-                    Nibbles(high=high_nibble, low=low_nibble)
-                ),
-                high_nibbles,
-                low_nibbles,
-            ),
-            addr=addr,
-            port=port,
-        )
+        start = tracer.enabled and perf_counter()
+        msg = cls(_octects(bytes.fromhex(s)), addr=addr, port=port)
+        if start:
+            tracer.emit("from_string", start, len(msg))
+        return msg
 
     @classmethod
     def from_bytes(cls, byts: bytes, addr: str = None, port: int = None) -> "lifx.Msg":
@@ -78,7 +71,11 @@ class Msg(abc.ABC, list):
         :param port: an IP port bound to this message
         :return: a lifx.Msg
         """
-        return cls([Octect(value=byte) for byte in byts], addr=addr, port=port)
+        start = tracer.enabled and perf_counter()
+        msg = cls(_octects(byts), addr=addr, port=port)
+        if start:
+            tracer.emit("from_bytes", start, len(msg))
+        return msg
 
     @classmethod
     @abc.abstractmethod
@@ -91,6 +88,9 @@ class Msg(abc.ABC, list):
     def decode(self) -> Tuple[Any]:
         ...
 
+    def __repr__(self):
+        return "[{}]".format(", ".join([_HEX[octect.value] for octect in self]))
+
     def __bytes__(self):
         return bytes([octect.value for octect in self])
 
@@ -118,4 +118,15 @@ class Octect(Union):
     _fields_ = [("nibble", Nibbles), ("value", c_uint8)]
 
     def __repr__(self, *args, **kwargs):
-        return "0x%02X" % self.value
+        return _HEX[self.value]
+
+
+_HEX = tuple("0x%02X" % value for value in range(256))
+
+
+def _octects(data: Iterable[int]) -> List[Octect]:
+    """
+    One lifx.Octect per byte, all sharing a single ctypes buffer
+    """
+    data = bytes(data)
+    return list((Octect * len(data)).from_buffer_copy(data))
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+import lifx
+
+from lifx.lan import batch
+
+
+class TestEncoders(unittest.TestCase):
+    """
+    The numpy and the struct encoders give the same bytes; the comparisons
+    need numpy, installed in CI for them (it is an optional dependency)
+    """
+
+    def setUp(self):
+        count = 64
+        generator = random.Random(7)
+        self.targets = [
+            generator.getrandbits(48).to_bytes(6, "big").hex() + "0000"
+            for _ in range(count)
+        ]
+        self.color = {
+            "hue": [generator.randrange(65536) for _ in range(count)],
+            "saturation": [generator.randrange(65536) for _ in range(count)],
+            "brightness": 32768,
+            "kelvin": [generator.randrange(2500, 9001) for _ in range(count)],
+            "duration": [generator.randrange(2**32) for _ in range(count)],
+        }
+        self.power = {"level": [generator.choice((0, 65535)) for _ in range(count)]}
+
+    def encode(self, encoder, body, layout, columns):
+        template = bytes(lifx.lan.Msg.encode(lifx.lan.header.make(body.state), body))
+        return encoder(template, self.targets, layout, columns).data
+
+    @unittest.skipIf(batch.numpy is None, "numpy is not installed")
+    def test_set_color(self):
+        body = lifx.lan.light.SetColor()
+        self.assertEqual(
+            self.encode(batch._encode_struct, body, batch._SET_COLOR, self.color),
+            self.encode(batch._encode_numpy, body, batch._SET_COLOR, self.color),
+        )
+
+    @unittest.skipIf(batch.numpy is None, "numpy is not installed")
+    def test_set_power(self):
+        body = lifx.lan.light.SetPower()
+        self.assertEqual(
+            self.encode(batch._encode_struct, body, batch._SET_POWER, self.power),
+            self.encode(batch._encode_numpy, body, batch._SET_POWER, self.power),
+        )
+
+    def test_long_target(self):
+        targets = self.targets[:1] + [bytes(9)]
+        for encoder in (batch._encode_struct, batch._encode_numpy):
+            if encoder is batch._encode_numpy and batch.numpy is None:
+                continue
+            with self.assertRaises(ValueError):
+                encoder(bytes(46), targets, batch._SET_POWER, {"level": 0})
+
+    @unittest.skipIf(batch.numpy is None, "numpy is not installed")
+    def test_target_array_shape(self):
+        targets = batch.numpy.zeros((2, 9), batch.numpy.uint8)
+        with self.assertRaises(ValueError):
+            batch._encode_numpy(bytes(46), targets, batch._SET_POWER, {"level": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,28 @@ import lifx
 
 
 tests = list()
+tests.append(doctest.DocTestSuite(lifx.trace))
 tests.append(doctest.DocTestSuite(lifx.lan.header))
 tests.append(doctest.DocTestSuite(lifx.lan.light))
 tests.append(doctest.DocTestSuite(lifx.lan.msg))
+tests.append(doctest.DocTestSuite(lifx.lan.pcap))
+tests.append(doctest.DocTestSuite(lifx.lan.index))
+tests.append(doctest.DocTestSuite(lifx.lan.table))
+tests.append(doctest.DocTestSuite(lifx.lan.history))
+tests.append(doctest.DocTestSuite(lifx.lan.scene))
+tests.append(doctest.DocTestSuite(lifx.lan.batch))
+tests.append(doctest.DocTestSuite(lifx.lan.snapshot))
+tests.append(doctest.DocTestSuite(lifx.lan.controller))
+tests.append(doctest.DocTestSuite(lifx.lan.client.asynchronous))
+tests.append(doctest.DocTestSuite(lifx.lan.client.metrics))
+tests.append(doctest.DocTestSuite(lifx.lan.client.sweep))
+tests.append(doctest.DocTestSuite(lifx.lan.client.shared))
+tests.append(doctest.DocTestSuite(lifx.lan.client.queue))
+tests.append(doctest.DocTestSuite(lifx.lan.client.rate))
+tests.append(doctest.DocTestSuite(lifx.lan.client.replies))
+tests.append(doctest.DocTestSuite(lifx.lan.client.telemetry))
+tests.append(doctest.DocTestSuite(lifx.lan.client.subscription))
+tests.append(doctest.DocTestSuite(lifx.lan.client.synchronous))
 
 tests.append(doctest.DocFileSuite("../docs/source/example.rst", package=lifx))
 
@@ -0,0 +1,52 @@
+from time import perf_counter
+from typing import Callable, List
+
+
+Hook = Callable[[str, float, int], None]
+
+
+class Tracer(object):
+    """
+    Instrumentation points of the codec and of the clients
+
+    Hooks are called as hook(event, seconds, size) where event is one of
+    "from_bytes", "from_string", "encode", "decode", "sendto" and "datagram",
+    seconds is the time spent and size the message length in bytes.
+    Without subscribers every instrumentation point costs a single attribute check.
+
+    >>> import lifx
+    >>> events = []
+    >>> hook = lambda event, seconds, size: events.append((event, size))
+    >>> lifx.trace.tracer.subscribe(hook)
+    >>> msg = lifx.Msg.from_bytes(bytes([0xFF, 0xFE, 0xFD]))
+    >>> lifx.trace.tracer.unsubscribe(hook)
+    >>> lifx.trace.tracer.enabled
+    False
+    >>> events
+    [('from_bytes', 3)]
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._hooks = []  # type: List[Hook]
+
+    def subscribe(self, hook: Hook):
+        self._hooks.append(hook)
+        self.enabled = True
+
+    def unsubscribe(self, hook: Hook):
+        self._hooks.remove(hook)
+        self.enabled = bool(self._hooks)
+
+    def emit(self, event: str, start: float, size: int):
+        """
+        :param event: the instrumentation point name
+        :param start: the perf_counter() value taken when the event began
+        :param size: the message length in bytes
+        """
+        seconds = perf_counter() - start
+        for hook in self._hooks:
+            hook(event, seconds, size)
+
+
+tracer = Tracer()
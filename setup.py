@@ -23,6 +23,7 @@ setup(name="lifx-lib",
             "Intended Audience :: Developers",
       ],
       packages=find_packages(exclude=[]),
+      extras_require={"numpy": ["numpy"]},
       include_package_data=True,
       )
 